@@ -0,0 +1,150 @@
+import datetime
+import json
+import threading
+from array import array
+
+from atomic import atomic_write
+from money import to_rupees
+
+DIMENSIONS = ("category", "item", "promotion")
+NO_PROMOTION = 0
+
+
+class SalesAnalytics:
+    def __init__(self):
+        self.days = array("i")
+        self.invoice_ids = array("i")
+        self.item_ids = array("i")
+        self.category_ids = array("i")
+        self.promotion_ids = array("q")
+        self.quantities = array("q")
+        self.revenue = array("q")
+        self.invoice_numbers = []
+        self.labels = {"category": [], "item": []}
+        self._label_index = {"category": {}, "item": {}}
+        self._daily = {}
+        self._rollups = {dimension: {} for dimension in DIMENSIONS}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.revenue)
+
+    def _key(self, dimension, label):
+        index = self._label_index[dimension]
+        key = index.get(label)
+        if key is None:
+            key = index[label] = len(self.labels[dimension])
+            self.labels[dimension].append(label)
+        return key
+
+    def record_invoice(self, number, when, lines):
+        day = when.toordinal()
+        lines = list(lines)
+        with self._lock:
+            invoice_id = len(self.invoice_numbers)
+            self.invoice_numbers.append(number)
+            for item, category, promotion, quantity, line_total in lines:
+                item_id = self._key("item", item)
+                category_id = self._key("category", category)
+                promotion_id = NO_PROMOTION if promotion is None else promotion.promotion_id
+                self.days.append(day)
+                self.invoice_ids.append(invoice_id)
+                self.item_ids.append(item_id)
+                self.category_ids.append(category_id)
+                self.promotion_ids.append(promotion_id)
+                self.quantities.append(quantity)
+                self.revenue.append(line_total)
+                self._roll_up(day, item_id, category_id, promotion_id, quantity, line_total)
+        return invoice_id
+
+    def _roll_up(self, day, item_id, category_id, promotion_id, quantity, line_total):
+        daily = self._daily.get(day)
+        if daily is None:
+            daily = self._daily[day] = [0, 0]
+            for dimension in DIMENSIONS:
+                self._rollups[dimension][day] = {}
+        daily[0] += line_total
+        daily[1] += quantity
+        for dimension, key in (("category", category_id), ("item", item_id), ("promotion", promotion_id)):
+            totals = self._rollups[dimension][day]
+            entry = totals.get(key)
+            if entry is None:
+                totals[key] = [line_total, quantity]
+            else:
+                entry[0] += line_total
+                entry[1] += quantity
+
+    def _days(self, start, end):
+        start = start.toordinal() if start is not None else None
+        end = end.toordinal() if end is not None else None
+        for day in self._daily:
+            if (start is None or day >= start) and (end is None or day <= end):
+                yield day
+
+    def revenue_by_day(self, start=None, end=None):
+        with self._lock:
+            return {datetime.date.fromordinal(day): to_rupees(self._daily[day][0])
+                    for day in sorted(self._days(start, end))}
+
+    def revenue_by(self, dimension, start=None, end=None, limit=None):
+        if dimension == "day":
+            return self.revenue_by_day(start, end)
+        return {label: to_rupees(line_total) for label, line_total in self._group(dimension, 0, start, end, limit)}
+
+    def units_by(self, dimension, start=None, end=None, limit=None):
+        return dict(self._group(dimension, 1, start, end, limit))
+
+    def _group(self, dimension, field, start, end, limit):
+        totals = {}
+        with self._lock:
+            rollups = self._rollups[dimension]
+            for day in self._days(start, end):
+                for key, entry in rollups[day].items():
+                    totals[key] = totals.get(key, 0) + entry[field]
+        ranked = sorted(totals.items(), key=lambda entry: entry[1], reverse=True)[:limit]
+        return [(self._label(dimension, key), value) for key, value in ranked]
+
+    def _label(self, dimension, key):
+        if dimension == "promotion":
+            return key if key != NO_PROMOTION else None
+        return self.labels[dimension][key]
+
+    def total_revenue(self, start=None, end=None):
+        with self._lock:
+            return to_rupees(sum(self._daily[day][0] for day in self._days(start, end)))
+
+    def rebuild(self):
+        with self._lock:
+            self._daily = {}
+            self._rollups = {dimension: {} for dimension in DIMENSIONS}
+            for day, item_id, category_id, promotion_id, quantity, line_total in zip(
+                    self.days, self.item_ids, self.category_ids, self.promotion_ids, self.quantities, self.revenue):
+                self._roll_up(day, item_id, category_id, promotion_id, quantity, line_total)
+
+    def save(self, path):
+        columns = ("days", "invoice_ids", "item_ids", "category_ids", "promotion_ids", "quantities", "revenue")
+        with self._lock:
+            meta = json.dumps({"invoice_numbers": self.invoice_numbers, "labels": self.labels,
+                               "columns": [[column, getattr(self, column).typecode] for column in columns],
+                               "lines": len(self)}).encode("utf-8")
+            with atomic_write(path) as file:
+                file.write(len(meta).to_bytes(8, "little"))
+                file.write(meta)
+                for column in columns:
+                    getattr(self, column).tofile(file)
+
+    @classmethod
+    def load(cls, path):
+        analytics = cls()
+        with open(path, "rb") as file:
+            meta = json.loads(file.read(int.from_bytes(file.read(8), "little")))
+            for column, typecode in meta["columns"]:
+                values = array(typecode)
+                values.fromfile(file, meta["lines"])
+                setattr(analytics, column, values)
+        analytics.invoice_numbers = meta["invoice_numbers"]
+        analytics.labels = meta["labels"]
+        analytics._label_index = {dimension: {label: key for key, label in enumerate(labels)}
+                                  for dimension, labels in analytics.labels.items()}
+        analytics.rebuild()
+        return analytics
@@ -0,0 +1,227 @@
+import datetime
+import json
+import mmap
+import os
+import struct
+import threading
+import zlib
+from decimal import Decimal
+
+from atomic import atomic_write
+from invoice import InvoiceRenderer
+from money import to_paise, to_rupees
+from numbering import _lock, _unlock
+
+# segment, offset, length, created_at (epoch seconds), payable (paise), crc32 of the customer name
+INDEX_RECORD = struct.Struct("<IQIqqI")
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _sample_invoice():
+    invoice = {"number": "2000-01-01-00-00-00-1", "date": "2000-01-01", "time": "00:00:00", "customer": "",
+               "discount_rate": 0, "discountable_amount": Decimal("0.00"), "discount_amount": Decimal("0.00"),
+               "payable_amount": Decimal("0.00")}
+    lines = [("", 1, Decimal("0.00"), Decimal("0.00"))]
+    tax_lines = [("CGST", "9", "", Decimal("0.00")), ("SGST", "9", "", Decimal("0.00"))]
+    return InvoiceRenderer().render_to_string(invoice, lines, tax_lines).encode("utf-8")
+
+
+def _customer_key(customer):
+    return zlib.crc32(customer.encode("utf-8"))
+
+
+class InvoiceArchive:
+    def __init__(self, directory="invoice_archive", segment_size=64 * 1024 * 1024, level=6):
+        self.directory = directory
+        self.segment_size = segment_size
+        self.level = level
+        self._lock = threading.Lock()
+        self._index = None
+        self._index_map = None
+        self._segments = {}
+        self._zdict = None
+        self._pid = None
+
+    def __getstate__(self):
+        return {"directory": self.directory, "segment_size": self.segment_size, "level": self.level}
+
+    def __setstate__(self, state):
+        self.__init__(state["directory"], state["segment_size"], state["level"])
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _segment_path(self, segment):
+        return self._path(f"segment-{segment:06d}.z")
+
+    @property
+    def zdict(self):
+        if self._zdict is None:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._path("dictionary")
+            if not os.path.exists(path):
+                with atomic_write(path) as file:
+                    file.write(_sample_invoice())
+            with open(path, "rb") as file:
+                self._zdict = file.read()
+        return self._zdict
+
+    @property
+    def index(self):
+        if self._index is None or self._pid != os.getpid():
+            # A forked worker must not share the parent's open file, or the flock stops serialising appends.
+            os.makedirs(self.directory, exist_ok=True)
+            self._index = open(self._path("index"), "a+b")
+            self._index_map = None
+            self._segments = {}
+            self._pid = os.getpid()
+        return self._index
+
+    def add(self, customer, created_at, payable_amount, render):
+        zdict = self.zdict
+        index = self.index
+        with self._lock:
+            _lock(index.fileno())
+            try:
+                index_size = os.fstat(index.fileno()).st_size
+                torn = index_size % INDEX_RECORD.size
+                if torn:
+                    index_size -= torn
+                    index.truncate(index_size)
+                invoice_id = index_size // INDEX_RECORD.size + 1
+                number = f"{created_at:%Y-%m-%d-%H-%M-%S}-{invoice_id}"
+                header = {"number": number, "customer": customer, "created_at": created_at.strftime(TIME_FORMAT),
+                          "payable_amount": str(payable_amount)}
+                payload = (json.dumps(header) + "\n" + render(number)).encode("utf-8")
+                compressor = zlib.compressobj(self.level, zdict=zdict)
+                block = compressor.compress(payload) + compressor.flush()
+
+                segment = 1
+                if index_size:
+                    segment, offset, length = INDEX_RECORD.unpack_from(
+                        self._read_index(index_size - INDEX_RECORD.size, INDEX_RECORD.size))[:3]
+                    if offset + length >= self.segment_size:
+                        segment += 1
+                with open(self._segment_path(segment), "ab") as file:
+                    offset = file.tell()
+                    file.write(block)
+                index.seek(0, os.SEEK_END)
+                index.write(INDEX_RECORD.pack(segment, offset, len(block), int(created_at.timestamp()),
+                                              to_paise(payable_amount), _customer_key(customer)))
+                index.flush()
+            finally:
+                _unlock(index.fileno())
+        return number
+
+    def _read_index(self, position, size):
+        index = self.index
+        index.seek(position)
+        return index.read(size)
+
+    def _mapped_index(self):
+        index = self.index
+        size = os.fstat(index.fileno()).st_size
+        size -= size % INDEX_RECORD.size
+        if self._index_map is None or len(self._index_map) < size:
+            if self._index_map is not None:
+                self._index_map.close()
+            self._index_map = None
+            if size:
+                self._index_map = mmap.mmap(index.fileno(), size, access=mmap.ACCESS_READ)
+        return self._index_map
+
+    def count(self):
+        with self._lock:
+            index_map = self._mapped_index()
+            return len(index_map) // INDEX_RECORD.size if index_map is not None else 0
+
+    def _entry(self, invoice_id):
+        index_map = self._mapped_index()
+        if index_map is None or not 1 <= invoice_id <= len(index_map) // INDEX_RECORD.size:
+            return None
+        return INDEX_RECORD.unpack_from(index_map, (invoice_id - 1) * INDEX_RECORD.size)
+
+    def _load(self, entry):
+        segment, offset, length = entry[:3]
+        file = self._segments.get(segment)
+        if file is None:
+            file = self._segments[segment] = open(self._segment_path(segment), "rb")
+        file.seek(offset)
+        decompressor = zlib.decompressobj(zdict=self.zdict)
+        payload = (decompressor.decompress(file.read(length)) + decompressor.flush()).decode("utf-8")
+        header, _, content = payload.partition("\n")
+        invoice = json.loads(header)
+        invoice["payable_amount"] = Decimal(invoice["payable_amount"])
+        invoice["content"] = content
+        return invoice
+
+    def get(self, number):
+        try:
+            invoice_id = int(str(number).rsplit("-", 1)[-1])
+        except ValueError:
+            return None
+        with self._lock:
+            entry = self._entry(invoice_id)
+            if entry is None:
+                return None
+            invoice = self._load(entry)
+        return invoice if invoice["number"] == number else None
+
+    def _summary(self, entry, invoice_id, customer=None):
+        created_at = datetime.datetime.fromtimestamp(entry[3])
+        if customer is None:
+            customer = self._load(entry)["customer"]
+        return {"number": f"{created_at:%Y-%m-%d-%H-%M-%S}-{invoice_id}", "customer": customer,
+                "created_at": created_at.strftime(TIME_FORMAT), "payable_amount": to_rupees(entry[4])}
+
+    def _scan(self, reverse=False):
+        index_map = self._mapped_index()
+        if index_map is None:
+            return
+        count = len(index_map) // INDEX_RECORD.size
+        invoice_ids = range(count, 0, -1) if reverse else range(1, count + 1)
+        for invoice_id in invoice_ids:
+            yield invoice_id, INDEX_RECORD.unpack_from(index_map, (invoice_id - 1) * INDEX_RECORD.size)
+
+    def recent(self, limit=20):
+        with self._lock:
+            results = []
+            for invoice_id, entry in self._scan(reverse=True):
+                if len(results) >= limit:
+                    break
+                results.append(self._summary(entry, invoice_id))
+            return results
+
+    def by_customer(self, customer, limit=None):
+        key = _customer_key(customer)
+        with self._lock:
+            results = []
+            for invoice_id, entry in self._scan(reverse=True):
+                if limit is not None and len(results) >= limit:
+                    break
+                if entry[5] == key and self._load(entry)["customer"] == customer:
+                    results.append(self._summary(entry, invoice_id, customer))
+            return results
+
+    def between(self, start, end, limit=None):
+        start, end = start.timestamp(), end.timestamp()
+        with self._lock:
+            results = []
+            for invoice_id, entry in self._scan():
+                if limit is not None and len(results) >= limit:
+                    break
+                if start <= entry[3] < end:
+                    results.append(self._summary(entry, invoice_id))
+            return results
+
+    def close(self):
+        with self._lock:
+            if self._index_map is not None:
+                self._index_map.close()
+                self._index_map = None
+            if self._index is not None:
+                self._index.close()
+                self._index = None
+            for file in self._segments.values():
+                file.close()
+            self._segments.clear()
@@ -0,0 +1,22 @@
+import contextlib
+import os
+import uuid
+
+# O_BINARY keeps Windows from translating newlines; the kernel applies the umask to the 0o666 mode.
+FLAGS = os.O_CREAT | os.O_EXCL | os.O_WRONLY | getattr(os, "O_BINARY", 0)
+
+
+@contextlib.contextmanager
+def atomic_write(path, mode="wb", **kwargs):
+    temp_path = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.{uuid.uuid4().hex}.tmp")
+    fd = os.open(temp_path, FLAGS, 0o666)
+    try:
+        with os.fdopen(fd, mode, **kwargs) as file:
+            yield file
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(temp_path)
+        raise
@@ -0,0 +1,97 @@
+from array import array
+
+from money import to_basis_points, to_rupees
+from readers import read_rows
+
+
+class BatchBiller:
+    def __init__(self, bill_system):
+        self.bill_system = bill_system
+        self.order_ids = []
+        self.customers = []
+        self.line_orders = array("i")
+        self.line_items = array("i")
+        self.line_quantities = array("q")
+        self.rejected = []
+        self._order_index = {}
+
+    def add_line(self, order_id, customer, item, quantity):
+        if not item:
+            self.rejected.append({"order_id": order_id, "item": item, "reason": "missing item"})
+            return
+        catalog = self.bill_system.catalog
+        item_id = catalog.id_of(item)
+        if item_id is None:
+            item_id = catalog.id_of_sku(item)
+        if item_id is None:
+            self.rejected.append({"order_id": order_id, "item": item, "reason": "unknown item"})
+            return
+        try:
+            quantity = int(quantity)
+        except (TypeError, ValueError):
+            quantity = 0
+        if quantity <= 0:
+            self.rejected.append({"order_id": order_id, "item": item, "reason": "invalid quantity"})
+            return
+
+        order_index = self._order_index.get(order_id)
+        if order_index is None:
+            order_index = len(self.order_ids)
+            self._order_index[order_id] = order_index
+            self.order_ids.append(order_id)
+            self.customers.append(customer)
+        self.line_orders.append(order_index)
+        self.line_items.append(item_id)
+        self.line_quantities.append(quantity)
+
+    def read(self, path):
+        for order in read_rows(path):
+            customer = order.get("customer", "")
+            order_id = order.get("order_id") or customer
+            for order_line in order.get("lines", (order,)):
+                self.add_line(order_id, customer, order_line.get("item"), order_line.get("quantity"))
+
+    def price(self):
+        bill_system = self.bill_system
+        catalog = bill_system.catalog
+        engine = bill_system.promotion_engine
+        unit_prices = {}
+        for item_id in set(self.line_items):
+            name = catalog.names[item_id]
+            if engine.is_per_unit(name, catalog.category_at(item_id)):
+                unit_prices[item_id] = bill_system.effective_price(name)
+
+        categories = {item_id: catalog.category_at(item_id) for item_id in set(self.line_items)}
+        totals = [{} for _ in self.order_ids]
+        grouped = {}
+        for order_index, item_id, quantity in zip(self.line_orders, self.line_items, self.line_quantities):
+            unit_price = unit_prices.get(item_id)
+            if unit_price is None:
+                key = (order_index, item_id)
+                grouped[key] = grouped.get(key, 0) + quantity
+            else:
+                order_totals = totals[order_index]
+                category = categories[item_id]
+                order_totals[category] = order_totals.get(category, 0) + unit_price * quantity
+        for (order_index, item_id), quantity in grouped.items():
+            order_totals = totals[order_index]
+            category = categories[item_id]
+            order_totals[category] = order_totals.get(category, 0) + bill_system.line_total(catalog.names[item_id], quantity)
+
+        bill_system.tax_table.set_default_rate(bill_system.tax_rate * 100)
+        discount_basis_points = to_basis_points(bill_system.discount_rate)
+        results = {}
+        for order_id, customer, order_totals in zip(self.order_ids, self.customers, totals):
+            total_cost = sum(order_totals.values())
+            discount_amount = bill_system.discount_on(total_cost)
+            tax_lines = bill_system.tax_table.tax_lines(order_totals, discount_basis_points)
+            tax_amount = sum(central + state for _, _, central, _, state in tax_lines)
+            results[order_id] = {
+                "customer": customer,
+                "total_cost": to_rupees(total_cost),
+                "discountable_amount": to_rupees(total_cost),
+                "discount_amount": to_rupees(discount_amount),
+                "tax_amount": to_rupees(tax_amount),
+                "payable_amount": to_rupees(total_cost - discount_amount + tax_amount),
+            }
+        return results
@@ -0,0 +1,233 @@
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from array import array
+
+from main import BillSystem
+
+CATEGORIES = ("Gadgets", "Electronics", "Stationery", "Grocery", "Clothing", "Toys", "Books", "Sports")
+WORDS = ("smart", "wireless", "steel", "classic", "pro", "mini", "max", "eco", "ultra", "family",
+         "travel", "kids", "home", "office", "outdoor", "premium")
+
+
+def make_items(size, seed=0):
+    rnd = random.Random(seed)
+    for item_id in range(size):
+        words = rnd.sample(WORDS, 2)
+        yield (f"{words[0].upper()} {words[1].upper()} {item_id:07d}", rnd.randint(100, 9999999) / 100,
+               CATEGORIES[item_id % len(CATEGORIES)], f"{words[0]} {words[1]} item {item_id}")
+
+
+def build_catalog(size, seed=0):
+    bill_system = BillSystem()
+    for name, price, category, description in make_items(size, seed):
+        bill_system.add_item(name, price, category, description)
+    for index, category in enumerate(CATEGORIES[:4]):
+        bill_system.add_category_promotion(category, "percentage", 5 + index)
+        bill_system.set_tax_rate(category, 5 + 6 * index)
+    return bill_system
+
+
+def fill_cart(bill_system, cart, lines, seed=0):
+    rnd = random.Random(seed)
+    for item_id in rnd.sample(range(len(bill_system.catalog)), lines):
+        cart[bill_system.catalog.name_at(item_id)] = rnd.randint(1, 5)
+    return cart
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def summarize(latencies, elapsed, peak_bytes=None):
+    ordered = sorted(latencies)
+    return {
+        "operations": len(ordered),
+        "seconds": elapsed,
+        "ops_per_second": len(ordered) / elapsed if elapsed else 0.0,
+        "p50_us": percentile(ordered, 0.50) / 1000,
+        "p90_us": percentile(ordered, 0.90) / 1000,
+        "p99_us": percentile(ordered, 0.99) / 1000,
+        "max_us": ordered[-1] / 1000 if ordered else 0,
+        "peak_bytes": peak_bytes,
+    }
+
+
+def timed(function, arguments):
+    latencies = array("q")
+    clock = time.perf_counter_ns
+    start = clock()
+    for argument in arguments:
+        before = clock()
+        function(*argument)
+        latencies.append(clock() - before)
+    return latencies, (clock() - start) / 1e9
+
+
+def peak_memory(function, *arguments):
+    tracemalloc.start()
+    try:
+        function(*arguments)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+@contextlib.contextmanager
+def quiet():
+    with open(os.devnull, "w", encoding="utf-8") as sink, contextlib.redirect_stdout(sink):
+        yield
+
+
+def bench_add_item(size, seed, memory):
+    bill_system = BillSystem()
+    latencies, elapsed = timed(bill_system.add_item, make_items(size, seed))
+    peak = peak_memory(build_catalog, size, seed) if memory else None
+    return summarize(latencies, elapsed, peak)
+
+
+def bench_select(bill_system, operations, seed):
+    rnd = random.Random(seed)
+    catalog = bill_system.catalog
+    cart = bill_system.new_cart()
+
+    def select_by_number(item_number):
+        item_name = catalog.name_at(item_number - 1)
+        if item_name in cart:
+            cart[item_name] += 1
+        else:
+            cart[item_name] = 1
+
+    numbers = [(rnd.randint(1, len(catalog)),) for _ in range(operations)]
+    by_number = summarize(*timed(select_by_number, numbers))
+    bill_system.search_items(WORDS[0])
+    queries = [(f"{rnd.choice(WORDS)} {rnd.choice(WORDS)[:3]}",) for _ in range(operations)]
+    by_search = summarize(*timed(bill_system.search_items, queries))
+    return by_number, by_search
+
+
+def bench_calculate_total(bill_system, cart, repeat, memory):
+    summary = summarize(*timed(bill_system.calculate_total, [(cart,)] * repeat))
+    if memory:
+        summary["peak_bytes"] = peak_memory(bill_system.calculate_total, cart)
+    return summary
+
+
+def bench_save_invoice(bill_system, cart, repeat, memory):
+    bill_system.cart = cart
+    with quiet():
+        summary = summarize(*timed(bill_system.save_invoice_to_file, [("Bench Customer",)] * repeat))
+        if memory:
+            summary["peak_bytes"] = peak_memory(bill_system.save_invoice_to_file, "Bench Customer")
+    return summary
+
+
+def bench_view_items(bill_system, repeat, limit):
+    with quiet():
+        return summarize(*timed(bill_system.view_items, [(limit,)] * repeat))
+
+
+def run(sizes, cart_sizes, repeat=20, operations=2000, seed=0, memory=True, view_limit=100000):
+    results = []
+
+    def record(benchmark, catalog_size, summary, **parameters):
+        results.append({"benchmark": benchmark, "catalog_size": catalog_size, **parameters, **summary})
+        print(f"{benchmark:<22} items={catalog_size:<8} "
+              + "".join(f"{key}={value} " for key, value in parameters.items())
+              + f"{summary['ops_per_second']:>12.1f} ops/s  p50={summary['p50_us']:.1f}us  p99={summary['p99_us']:.1f}us",
+              file=sys.stderr)
+
+    working_directory = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            for size in sizes:
+                record("add_item", size, bench_add_item(size, seed, memory))
+                bill_system = build_catalog(size, seed)
+                by_number, by_search = bench_select(bill_system, operations, seed)
+                record("select_by_number", size, by_number)
+                record("select_by_search", size, by_search)
+                for lines in cart_sizes:
+                    if lines > size:
+                        continue
+                    cart = fill_cart(bill_system, bill_system.new_cart(), lines, seed)
+                    record("calculate_total", size, bench_calculate_total(bill_system, cart, repeat, memory),
+                           cart_lines=lines)
+                    record("save_invoice_to_file", size, bench_save_invoice(bill_system, cart, repeat, memory),
+                           cart_lines=lines)
+                record("view_items_page", size, bench_view_items(bill_system, repeat, 50), limit=50)
+                if size <= view_limit:
+                    record("view_items", size, bench_view_items(bill_system, max(1, repeat // 10), None))
+        finally:
+            os.chdir(working_directory)
+
+    return {
+        "meta": {
+            "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": sizes,
+            "cart_sizes": cart_sizes,
+            "repeat": repeat,
+            "operations": operations,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline, current):
+    key = lambda result: (result["benchmark"], result["catalog_size"], result.get("cart_lines"), result.get("limit"))
+    previous = {key(result): result for result in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        before = previous.get(key(result))
+        if before is None or not before["p50_us"]:
+            continue
+        rows.append({"benchmark": result["benchmark"], "catalog_size": result["catalog_size"],
+                     "cart_lines": result.get("cart_lines"),
+                     "p50_ratio": result["p50_us"] / before["p50_us"],
+                     "throughput_ratio": result["ops_per_second"] / before["ops_per_second"]})
+    return rows
+
+
+def parse_sizes(text):
+    return [int(float(size)) for size in text.split(",") if size]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the billing hot paths.")
+    parser.add_argument("--sizes", type=parse_sizes, default=[1000, 10000, 100000],
+                        help="comma-separated catalog sizes, e.g. 1000,10000,1e6")
+    parser.add_argument("--cart-sizes", type=parse_sizes, default=[1, 10, 100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=20, help="runs per cart benchmark")
+    parser.add_argument("--operations", type=int, default=2000, help="selections per catalog size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak-memory runs")
+    parser.add_argument("--view-limit", type=int, default=100000,
+                        help="largest catalog to print in full for view_items")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    report = run(args.sizes, args.cart_sizes, args.repeat, args.operations, args.seed, not args.no_memory,
+                 args.view_limit)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            report["comparison"] = compare(json.load(file), report)
+        for row in report["comparison"]:
+            print(f"{row['benchmark']:<22} items={row['catalog_size']:<8} lines={row['cart_lines']}  "
+                  f"p50 x{row['p50_ratio']:.2f}  throughput x{row['throughput_ratio']:.2f}", file=sys.stderr)
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to {args.output}")
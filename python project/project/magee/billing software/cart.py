@@ -0,0 +1,107 @@
+import datetime
+import threading
+from collections.abc import MutableMapping
+
+
+class Cart(MutableMapping):
+    __slots__ = ("price_line", "category_of", "quantities", "line_totals", "line_categories", "line_promotions",
+                 "category_totals", "subtotal", "lock", "journal", "priced_at", "__weakref__")
+
+    def __init__(self, price_line, category_of):
+        self.price_line = price_line
+        self.category_of = category_of
+        self.quantities = {}
+        self.line_totals = {}
+        self.line_categories = {}
+        self.line_promotions = {}
+        self.category_totals = {}
+        self.subtotal = 0
+        self.lock = threading.RLock()
+        self.journal = None
+        self.priced_at = datetime.datetime.now()
+
+    def __getitem__(self, item):
+        return self.quantities[item]
+
+    def __setitem__(self, item, quantity):
+        line_total, promotion = self.price_line(item, quantity)
+        category = self.category_of(item)
+        with self.lock:
+            self._set_line(item, quantity, line_total, category, promotion)
+            if self.journal is not None:
+                self.journal.set(item, quantity)
+
+    def _set_line(self, item, quantity, line_total, category, promotion):
+        category_totals = self.category_totals
+        old_total = self.line_totals.get(item, 0)
+        old_category = self.line_categories.get(item)
+        if old_category is not None:
+            category_totals[old_category] -= old_total
+            if not category_totals[old_category] and old_category != category:
+                del category_totals[old_category]
+        category_totals[category] = category_totals.get(category, 0) + line_total
+        self.subtotal += line_total - old_total
+        self.quantities[item] = quantity
+        self.line_totals[item] = line_total
+        self.line_categories[item] = category
+        self.line_promotions[item] = promotion
+
+    def __delitem__(self, item):
+        with self.lock:
+            del self.quantities[item]
+            line_total = self.line_totals.pop(item)
+            category = self.line_categories.pop(item)
+            del self.line_promotions[item]
+            self.category_totals[category] -= line_total
+            if not self.category_totals[category]:
+                del self.category_totals[category]
+            self.subtotal -= line_total
+            if self.journal is not None:
+                self.journal.remove(item)
+
+    def __iter__(self):
+        return iter(self.quantities)
+
+    def __len__(self):
+        return len(self.quantities)
+
+    def __contains__(self, item):
+        return item in self.quantities
+
+    def clear(self):
+        with self.lock:
+            self.quantities.clear()
+            self.line_totals.clear()
+            self.line_categories.clear()
+            self.line_promotions.clear()
+            self.category_totals.clear()
+            self.subtotal = 0
+            if self.journal is not None:
+                self.journal.clear()
+
+    def add(self, item, quantity):
+        with self.lock:
+            self[item] = self.quantities.get(item, 0) + quantity
+
+    def add_many(self, lines):
+        price_line = self.price_line
+        category_of = self.category_of
+        with self.lock:
+            quantities = self.quantities
+            for item, quantity in lines:
+                quantity += quantities.get(item, 0)
+                line_total, promotion = price_line(item, quantity)
+                self._set_line(item, quantity, line_total, category_of(item), promotion)
+                if self.journal is not None:
+                    self.journal.set(item, quantity)
+
+    def reprice(self, item):
+        with self.lock:
+            quantity = self.quantities.get(item)
+            if quantity is not None:
+                line_total, promotion = self.price_line(item, quantity)
+                self._set_line(item, quantity, line_total, self.category_of(item), promotion)
+
+    def lines(self):
+        line_totals = self.line_totals
+        return ((item, quantity, line_totals[item]) for item, quantity in self.quantities.items())
@@ -0,0 +1,132 @@
+from array import array
+from collections.abc import Mapping
+
+from money import to_paise
+
+
+class Catalog:
+    __slots__ = ("names", "prices", "category_ids", "descriptions", "skus",
+                 "category_names", "_category_index", "_name_index", "_sku_index", "_source")
+
+    def __init__(self):
+        self.names = []
+        self.prices = array("q")
+        self.category_ids = array("i")
+        self.descriptions = []
+        self.skus = []
+        self.category_names = []
+        self._category_index = {}
+        self._name_index = {}
+        self._sku_index = {}
+        self._source = None
+
+    def __reduce__(self):
+        if self._source is not None:
+            loader, path = self._source
+            return loader, (path,)
+        state = {slot: getattr(self, slot) for slot in self.__slots__}
+        return Catalog, (), (None, state)
+
+    @property
+    def is_mapped(self):
+        return self._source is not None
+
+    def materialize(self):
+        if self._source is None:
+            return
+        self.names = list(self.names)
+        self.prices = array("q", self.prices)
+        self.category_ids = array("i", self.category_ids)
+        self.descriptions = list(self.descriptions)
+        self.skus = list(self.skus)
+        self._name_index = {name: item_id for item_id, name in enumerate(self.names)}
+        self._sku_index = {sku: item_id for item_id, sku in enumerate(self.skus) if sku is not None}
+        self._source = None
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self._name_index
+
+    def category_id(self, category):
+        category_id = self._category_index.get(category)
+        if category_id is None:
+            category_id = len(self.category_names)
+            self._category_index[category] = category_id
+            self.category_names.append(category)
+        return category_id
+
+    def add(self, name, price, category="General", description="", sku=None):
+        if self._source is not None:
+            self.materialize()
+        price = to_paise(price)
+        if price < 0:
+            raise ValueError("Price cannot be negative.")
+        category_id = self.category_id(category)
+        item_id = self._name_index.get(name)
+        if item_id is None:
+            item_id = len(self.names)
+            self._name_index[name] = item_id
+            self.names.append(name)
+            self.prices.append(price)
+            self.category_ids.append(category_id)
+            self.descriptions.append(description)
+            self.skus.append(sku)
+        else:
+            self.prices[item_id] = price
+            self.category_ids[item_id] = category_id
+            self.descriptions[item_id] = description
+            old_sku = self.skus[item_id]
+            if sku is None:
+                sku = old_sku
+            elif old_sku is not None and old_sku != sku:
+                del self._sku_index[old_sku]
+            self.skus[item_id] = sku
+        if sku is not None:
+            self._sku_index[sku] = item_id
+        return item_id
+
+    def id_of(self, name):
+        return self._name_index.get(name)
+
+    def id_of_sku(self, sku):
+        return self._sku_index.get(sku)
+
+    def name_at(self, item_id):
+        return self.names[item_id]
+
+    def price_at(self, item_id):
+        return self.prices[item_id]
+
+    def category_at(self, item_id):
+        return self.category_names[self.category_ids[item_id]]
+
+    # Plain numbers, like the dict the items view replaced, so callers doing float arithmetic keep working.
+    def record(self, item_id):
+        paise = self.prices[item_id]
+        price = paise // 100 if paise % 100 == 0 else paise / 100
+        return {"price": price, "category": self.category_at(item_id), "description": self.descriptions[item_id]}
+
+
+class ItemsView(Mapping):
+    __slots__ = ("catalog",)
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+
+    def __getitem__(self, name):
+        item_id = self.catalog.id_of(name)
+        if item_id is None:
+            raise KeyError(name)
+        return self.catalog.record(item_id)
+
+    def __contains__(self, name):
+        return name in self.catalog
+
+    def __iter__(self):
+        return iter(self.catalog.names)
+
+    def __len__(self):
+        return len(self.catalog)
+
@@ -0,0 +1,59 @@
+import builtins
+import time
+
+
+class Console:
+    def __init__(self, record_to=None):
+        self.record_to = record_to
+
+    def input(self, prompt=""):
+        entry = builtins.input(prompt)
+        if self.record_to is not None:
+            with open(self.record_to, "a", encoding="utf-8") as file:
+                file.write(entry + "\n")
+        return entry
+
+    def print(self, *values, sep=" ", end="\n"):
+        builtins.print(*values, sep=sep, end=end)
+
+    def record_step(self, step, seconds):
+        pass
+
+
+class ScriptedConsole(Console):
+    def __init__(self, entries, keep_output=False):
+        super().__init__()
+        self.entries = iter(entries)
+        self.output = [] if keep_output else None
+        self.steps = []
+
+    @classmethod
+    def from_file(cls, path, keep_output=False):
+        with open(path, encoding="utf-8") as file:
+            return cls(file.read().splitlines(), keep_output)
+
+    def input(self, prompt=""):
+        if self.output is not None:
+            self.output.append(prompt)
+        try:
+            return next(self.entries)
+        except StopIteration:
+            raise EOFError("The session script ended before the session did.") from None
+
+    def print(self, *values, sep=" ", end="\n"):
+        if self.output is not None:
+            self.output.append(sep.join(map(str, values)) + end)
+
+    def record_step(self, step, seconds):
+        self.steps.append((step, seconds))
+
+    def transcript(self):
+        return "".join(self.output or ())
+
+
+def timed_step(console, step, function, *args):
+    start = time.perf_counter()
+    try:
+        return function(*args)
+    finally:
+        console.record_step(step, time.perf_counter() - start)
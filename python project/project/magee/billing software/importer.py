@@ -0,0 +1,65 @@
+import itertools
+import time
+
+from readers import read_rows
+
+
+class CatalogImporter:
+    def __init__(self, bill_system, chunk_size=10000):
+        self.bill_system = bill_system
+        self.chunk_size = chunk_size
+        self.rows = 0
+        self.added = 0
+        self.updated = 0
+        self.rejected = []
+
+    def run(self, path):
+        start = time.perf_counter()
+        rows = read_rows(path)
+        while True:
+            chunk = list(itertools.islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            self.upsert(chunk)
+        elapsed = time.perf_counter() - start
+        return {
+            "rows": self.rows,
+            "added": self.added,
+            "updated": self.updated,
+            "rejected": self.rejected,
+            "elapsed": elapsed,
+            "rows_per_second": self.rows / elapsed if elapsed else 0.0,
+        }
+
+    def upsert(self, rows):
+        bill_system = self.bill_system
+        catalog = bill_system.catalog
+        changed = set()
+        for row in rows:
+            self.rows += 1
+            name = (row.get("name") or "").strip()
+            if not name:
+                self.rejected.append({"row": self.rows, "name": name, "reason": "missing name"})
+                continue
+            item_id = catalog.id_of(name)
+            if item_id is None:
+                category = row.get("category") or "General"
+                description = row.get("description") or ""
+            else:
+                category = row.get("category") or catalog.category_at(item_id)
+                description = row.get("description") or catalog.descriptions[item_id]
+            try:
+                bill_system.upsert_item(name, row.get("price"), category, description, row.get("sku") or None)
+            except (TypeError, ValueError, ArithmeticError):
+                self.rejected.append({"row": self.rows, "name": name, "reason": "invalid price"})
+                continue
+            if item_id is None:
+                self.added += 1
+            else:
+                self.updated += 1
+            changed.add(name)
+
+        for cart in list(bill_system._carts.values()):
+            with cart.lock:
+                for item in [item for item in cart if item in changed]:
+                    cart.reprice(item)
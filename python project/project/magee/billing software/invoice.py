@@ -0,0 +1,64 @@
+import io
+
+from atomic import atomic_write
+
+RULE = "=" * 60 + "\n"
+DIVIDER = "-" * 60 + "\n"
+
+HEADER = (
+    RULE
+    + "ELECTRONIC STORE\t\tINVOICE\n\n"
+    + "Invoice: {number}\tDate: {date}\n"
+    + "\t\t\tTime: {time}\n"
+    + "Name of Customer: {customer}\n"
+    + RULE
+    + "PARTICULAR\tQUANTITY\tUNIT PRICE\tTOTAL\n"
+    + DIVIDER
+)
+LINE = "{0:<15} {1:<10} ₹{2:<10.2f} ₹{3:<10.2f}\n"
+FOOTER = (
+    DIVIDER
+    + "\t\tYour discountable amount: ₹{discountable_amount:.2f}\n"
+    + DIVIDER
+    + "\t\tYour {discount_rate}% discounted amount is: ₹{discount_amount:.2f}\n"
+    + DIVIDER
+)
+TAX_LINE = "\t\t{0} @ {1}% on {2}: ₹{3:.2f}\n"
+CLOSING = (
+    "\t\tYour payable amount is: ₹{payable_amount:.2f}\n"
+    + DIVIDER
+    + "\n\tThank You {customer} for your shopping.\n"
+    + "\t\tSee you again!\n"
+    + RULE
+)
+
+
+class InvoiceRenderer:
+    def __init__(self, header=HEADER, line=LINE, footer=FOOTER, tax_line=TAX_LINE, closing=CLOSING,
+                 buffer_size=64 * 1024):
+        self._header = header.format_map
+        self._line = line.format
+        self._footer = footer.format_map
+        self._tax_line = tax_line.format
+        self._closing = closing.format_map
+        self.buffer_size = buffer_size
+
+    def render(self, file, invoice, lines, tax_lines=()):
+        line = self._line
+        file.write(self._header(invoice))
+        file.writelines(line(*invoice_line) for invoice_line in lines)
+        file.write(self._footer(invoice))
+        if tax_lines:
+            tax_line = self._tax_line
+            file.writelines(tax_line(*invoice_tax_line) for invoice_tax_line in tax_lines)
+            file.write(DIVIDER)
+        file.write(self._closing(invoice))
+
+    def render_to_string(self, invoice, lines, tax_lines=()):
+        buffer = io.StringIO()
+        self.render(buffer, invoice, lines, tax_lines)
+        return buffer.getvalue()
+
+    def save(self, file_name, invoice, lines, tax_lines=()):
+        with atomic_write(file_name, "w", encoding="utf-8", buffering=self.buffer_size) as file:
+            self.render(file, invoice, lines, tax_lines)
@@ -0,0 +1,132 @@
+import os
+import sqlite3
+import threading
+
+from money import to_paise, to_rupees
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS invoices (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    number TEXT UNIQUE,
+    customer TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    payable_paise INTEGER NOT NULL,
+    content TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS invoices_by_customer ON invoices (customer, created_at);
+CREATE INDEX IF NOT EXISTS invoices_by_created_at ON invoices (created_at);
+"""
+
+COLUMNS = "number, customer, created_at, payable_paise"
+
+# Stores written before amounts were kept in paise hold payable_amount as a REAL in rupees.
+MIGRATE_REAL_AMOUNTS = """
+ALTER TABLE invoices RENAME TO invoices_real;
+CREATE TABLE invoices (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    number TEXT UNIQUE,
+    customer TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    payable_paise INTEGER NOT NULL,
+    content TEXT NOT NULL
+);
+INSERT INTO invoices (id, number, customer, created_at, payable_paise, content)
+    SELECT id, number, customer, created_at, CAST(ROUND(payable_amount * 100) AS INTEGER), content FROM invoices_real;
+DROP TABLE invoices_real
+"""
+
+
+def _columns(connection):
+    return {row["name"] for row in connection.execute("PRAGMA table_info(invoices)")}
+
+
+def _migrate(connection):
+    if "payable_amount" not in _columns(connection):
+        return
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        # Another process may have migrated while this one waited for the write lock.
+        if "payable_amount" in _columns(connection):
+            for statement in MIGRATE_REAL_AMOUNTS.split(";"):
+                connection.execute(statement)
+        connection.execute("COMMIT")
+    except BaseException:
+        connection.execute("ROLLBACK")
+        raise
+
+
+class InvoiceStore:
+    def __init__(self, path="invoices.db"):
+        self.path = path
+        self._connection = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"])
+
+    @property
+    def connection(self):
+        if self._connection is None or self._pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            _migrate(connection)
+            connection.executescript(SCHEMA)
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+
+    def close(self):
+        if self._connection is not None and self._pid == os.getpid():
+            self._connection.close()
+        self._connection = None
+
+    def add(self, customer, created_at, payable_amount, render):
+        created = created_at.strftime("%Y-%m-%d %H:%M:%S")
+        with self._lock, self.connection as connection:
+            cursor = connection.execute(
+                "INSERT INTO invoices (customer, created_at, payable_paise, content) VALUES (?, ?, ?, '')",
+                (customer, created, to_paise(payable_amount)),
+            )
+            invoice_id = cursor.lastrowid
+            number = f"{created_at:%Y-%m-%d-%H-%M-%S}-{invoice_id}"
+            connection.execute(
+                "UPDATE invoices SET number = ?, content = ? WHERE id = ?",
+                (number, render(number), invoice_id),
+            )
+        return number
+
+    def _query(self, sql, parameters=()):
+        with self._lock:
+            rows = [dict(row) for row in self.connection.execute(sql, parameters)]
+        for row in rows:
+            row["payable_amount"] = to_rupees(row.pop("payable_paise"))
+        return rows
+
+    def get(self, number):
+        rows = self._query(f"SELECT {COLUMNS}, content FROM invoices WHERE number = ?", (number,))
+        return rows[0] if rows else None
+
+    def by_customer(self, customer, limit=None):
+        return self._query(
+            f"SELECT {COLUMNS} FROM invoices WHERE customer = ? ORDER BY created_at DESC, id DESC LIMIT ?",
+            (customer, -1 if limit is None else limit),
+        )
+
+    def between(self, start, end, limit=None):
+        return self._query(
+            f"SELECT {COLUMNS} FROM invoices WHERE created_at >= ? AND created_at < ? ORDER BY created_at, id LIMIT ?",
+            (start.strftime("%Y-%m-%d %H:%M:%S"), end.strftime("%Y-%m-%d %H:%M:%S"), -1 if limit is None else limit),
+        )
+
+    def recent(self, limit=20):
+        return self._query(f"SELECT {COLUMNS} FROM invoices ORDER BY id DESC LIMIT ?", (limit,))
+
+    def count(self):
+        with self._lock:
+            return self.connection.execute("SELECT COUNT(*) FROM invoices").fetchone()[0]
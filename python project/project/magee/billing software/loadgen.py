@@ -0,0 +1,133 @@
+import argparse
+import concurrent.futures
+import copy
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+
+from archive import InvoiceArchive
+from bench import percentile
+from console import ScriptedConsole
+from invoice_store import InvoiceStore
+from main import BillSystem, run_menu, sample_bill_system
+
+_bill_system = None
+
+DEFAULT_SCRIPT = ["Load Customer", "1", "2", "1", "2", "4", "3", "0", "3", "LAPTOP", "update", "2", "done", "4", "5", "6"]
+
+
+def _init_worker(bill_system):
+    global _bill_system
+    _bill_system = bill_system
+
+
+def replay(bill_system, entries):
+    # The copy shares the catalog, price cache and invoice numbering like tills in one shop; the invoice list
+    # shown by "View past invoices" belongs to the session.
+    session = copy.copy(bill_system)
+    session.past_invoices = []
+    session.console = ScriptedConsole(entries)
+    start = time.perf_counter()
+    error = None
+    try:
+        run_menu(session)
+    except Exception as exception:
+        error = f"{type(exception).__name__}: {exception}"
+    return time.perf_counter() - start, session.console.steps, error
+
+
+def _replay_in_worker(entries):
+    return replay(_bill_system, entries)
+
+
+def generate_load(bill_system, scripts, sessions, workers=None, use_processes=False):
+    tasks = itertools.islice(itertools.cycle(scripts), sessions)
+    if use_processes:
+        executor = concurrent.futures.ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(bill_system,))
+        run = _replay_in_worker
+    else:
+        executor = concurrent.futures.ThreadPoolExecutor(workers)
+        run = lambda entries: replay(bill_system, entries)
+
+    session_times = []
+    step_times = {}
+    errors = []
+    start = time.perf_counter()
+    with executor:
+        for elapsed, steps, error in executor.map(run, tasks):
+            if error is not None:
+                errors.append(error)
+                continue
+            session_times.append(elapsed)
+            for step, seconds in steps:
+                step_times.setdefault(step, []).append(seconds)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "sessions": len(session_times),
+        "errors": errors,
+        "elapsed": elapsed,
+        "sessions_per_second": len(session_times) / elapsed if elapsed else 0.0,
+        "session_latency_ms": _latency(session_times),
+        "step_latency_ms": {step: _latency(times) for step, times in step_times.items()},
+    }
+
+
+def _latency(seconds):
+    ordered = sorted(seconds)
+    return {
+        "count": len(ordered),
+        "p50": percentile(ordered, 0.50) * 1000,
+        "p90": percentile(ordered, 0.90) * 1000,
+        "p99": percentile(ordered, 0.99) * 1000,
+        "max": ordered[-1] * 1000 if ordered else 0,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay till sessions against the billing menu in parallel.")
+    parser.add_argument("scripts", nargs="*", help="session scripts, one typed line per line (main.py --record)")
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--processes", action="store_true", help="replay in worker processes instead of threads")
+    parser.add_argument("--snapshot", help="catalog snapshot written by BillSystem.save_snapshot")
+    parser.add_argument("--store", help="SQLite invoice store; invoices go to text files when omitted")
+    parser.add_argument("--archive", help="compressed invoice archive directory")
+    parser.add_argument("--output", help="write the report as JSON to this file")
+    args = parser.parse_args()
+
+    scripts = []
+    for path in args.scripts:
+        with open(path, encoding="utf-8") as file:
+            scripts.append(file.read().splitlines())
+
+    working_directory = os.getcwd()
+    store = None
+    if args.archive:
+        store = InvoiceArchive(os.path.abspath(args.archive))
+    elif args.store:
+        store = InvoiceStore(os.path.abspath(args.store))
+    if args.snapshot:
+        bill_system = BillSystem.from_snapshot(args.snapshot, invoice_store=store)
+    else:
+        bill_system = sample_bill_system(invoice_store=store)
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            report = generate_load(bill_system, scripts or [DEFAULT_SCRIPT], args.sessions, args.workers,
+                                   args.processes)
+        finally:
+            os.chdir(working_directory)
+
+    print(f"{report['sessions']} sessions in {report['elapsed']:.2f}s: {report['sessions_per_second']:.1f} sessions/s, "
+          f"{len(report['errors'])} errors", file=sys.stderr)
+    for step, latency in report["step_latency_ms"].items():
+        print(f"  {step:<22} n={latency['count']:<7} p50={latency['p50']:.2f}ms  p90={latency['p90']:.2f}ms  "
+              f"p99={latency['p99']:.2f}ms  max={latency['max']:.2f}ms", file=sys.stderr)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
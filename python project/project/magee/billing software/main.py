@@ -1,163 +1,560 @@
+import argparse
 import datetime
 import os
+import weakref
+
+from analytics import SalesAnalytics
+from batch import BatchBiller
+from cart import Cart
+from catalog import Catalog, ItemsView
+from console import Console, timed_step
+from importer import CatalogImporter
+from invoice import InvoiceRenderer
+from invoice_store import InvoiceStore
+from metrics import Metrics
+from numbering import InvoiceNumberAllocator
+from money import percent_of, to_basis_points, to_rupees
+from parallel import generate_invoices
+from price_cache import PriceCache
+from promotions import Promotion, PromotionEngine
+from search import CatalogSearch
+from snapshot import promotion_state, read_snapshot, restore_promotion, write_snapshot
+from tax import TaxTable
+from wal import CartJournal, CartLog, promotion_record, promotion_removal_record
+
+DEFAULT_CART = "default"
+INSTRUMENTED = ("add_to_cart", "calculate_total", "save_invoice_to_file", "write_invoice")
 
 class BillSystem:
-    def __init__(self):
-        self.items = {}
-        self.cart = {}
+    def __init__(self, invoice_store=None):
+        self.catalog = Catalog()
+        self.items = ItemsView(self.catalog)
+        self._search_index = CatalogSearch()
+        self._carts = weakref.WeakValueDictionary()
+        self.journal = None
+        self.recovered_carts = {}
+        self.cart = self.new_cart()
         self.tax_rate = 0.1
+        self.tax_table = TaxTable(self.tax_rate * 100)
         self.discount_rate = 0
         self.past_invoices = []
-        self.categories = {}
+        self._categories = {}
         self.promotions = {}
+        self.promotion_engine = PromotionEngine()
+        self._item_promotion_ids = {}
+        self.price_cache = PriceCache()
+        self.invoice_renderer = InvoiceRenderer()
+        self.invoice_store = invoice_store
+        self.invoice_numbers = InvoiceNumberAllocator()
+        self.analytics = SalesAnalytics()
+        self.metrics = None
+        self.console = Console()
 
-    def add_item(self, name, price, category="General", description=""):
-        self.items[name] = {"price": price, "category": category, "description": description}
-        if category not in self.categories:
-            self.categories[category] = []
-        self.categories[category].append(name)
-    
-    def add_promotion(self, item_name, discount_type="percentage", discount_value=0):
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["cart"]
+        del state["_carts"]
+        state["journal"] = None
+        state["recovered_carts"] = {}
+        state["analytics"] = None
+        state["metrics"] = None
+        state["console"] = Console()
+        for name in INSTRUMENTED + ("price_line", "new_cart"):
+            state.pop(name, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._carts = weakref.WeakValueDictionary()
+        self.cart = self.new_cart()
+
+    @classmethod
+    def from_snapshot(cls, path, invoice_store=None):
+        bill_system = cls(invoice_store)
+        catalog, meta = read_snapshot(path)
+        bill_system.catalog = catalog
+        bill_system.items = ItemsView(catalog)
+        bill_system._search_index = None
+        bill_system._categories = None
+        bill_system.price_cache.invalidate_all()
+        for state in meta["promotions"]:
+            item_default = meta["item_promotion_ids"].get(state["item"]) == state["promotion_id"]
+            bill_system._restore_rule(state, item_default)
+        bill_system.promotion_engine.next_id = max(bill_system.promotion_engine.next_id, meta["next_promotion_id"])
+        for category, percentage in meta.get("tax_slabs", {}).items():
+            bill_system.tax_table.set_rate(category, percentage)
+        bill_system.tax_table.compile(catalog.category_names)
+        return bill_system
+
+    def save_snapshot(self, path):
+        write_snapshot(path, self.catalog, self.promotion_engine, self._item_promotion_ids, self.tax_table)
+
+    def _restore_rule(self, state, item_default=False):
+        promotion = restore_promotion(Promotion, state)
+        self.promotion_engine.restore(promotion)
+        self._invalidate_prices(promotion)
+        if item_default:
+            self._item_promotion_ids[promotion.item] = promotion.promotion_id
+            self.promotions[promotion.item] = {"type": promotion.type, "value": promotion.value}
+        return promotion
+
+    def enable_journal(self, directory, flush_interval=0.005, snapshot_every=50000):
+        journal = CartJournal(directory, flush_interval, snapshot_every, self.journal_state)
+        state = journal.recover()
+        if state["promotions_complete"]:
+            removed = [promotion_id for promotion_id in list(self.promotion_engine.rules)
+                       if promotion_id not in state["promotions"]]
+        else:
+            removed = state["removed_promotions"]
+        for promotion_id in removed:
+            self._drop_rule(promotion_id)
+        for saved in state["promotions"].values():
+            self._drop_rule(saved["promotion"]["promotion_id"])
+            self._restore_rule(saved["promotion"], saved["item_default"])
+        for cart in list(self._carts.values()):
+            with cart.lock:
+                for item in list(cart):
+                    cart.reprice(item)
+
+        self.recovered_carts = state["carts"]
+        default = self.recovered_carts.pop(DEFAULT_CART, None)
+        journal.start()
+        self.journal = journal
+        self.cart.journal = CartLog(journal, DEFAULT_CART)
+        if default is not None:
+            self.cart.clear()
+            self.cart.add_many(default["lines"].items())
+        journal.checkpoint()
+        return journal
+
+    def journal_state(self):
+        carts = {}
+        for cart in list(self._carts.values()):
+            log = cart.journal
+            if log is not None:
+                with cart.lock:
+                    carts[log.cart_id] = {"customer": log.customer, "lines": dict(cart.quantities)}
+        for cart_id, saved in list(self.recovered_carts.items()):
+            carts.setdefault(cart_id, saved)
+        promotions = [{"promotion": promotion_state(promotion),
+                       "item_default": self._item_promotion_ids.get(promotion.item) == promotion.promotion_id}
+                      for promotion in list(self.promotion_engine.rules.values())]
+        return {"carts": carts, "promotions": promotions}
+
+    def enable_metrics(self, metrics=None):
+        if self.metrics is not None:
+            return self.metrics
+        metrics = metrics if metrics is not None else Metrics()
+        for name in INSTRUMENTED:
+            setattr(self, name, metrics.timed(name, getattr(self, name)))
+
+        price_line = self.price_line
+        new_cart = self.new_cart
+
+        def counted_price_line(item, quantity):
+            line = price_line(item, quantity)
+            metrics.increment("promotion_lookups")
+            if line[1] is not None:
+                metrics.increment("promotion_hits")
+            return line
+
+        def counted_new_cart(*args, **kwargs):
+            metrics.increment("carts_created")
+            return new_cart(*args, **kwargs)
+
+        self.price_line = counted_price_line
+        self.new_cart = counted_new_cart
+        self.metrics = metrics
+        return metrics
+
+    def disable_metrics(self):
+        for name in INSTRUMENTED + ("price_line", "new_cart"):
+            self.__dict__.pop(name, None)
+        metrics, self.metrics = self.metrics, None
+        return metrics
+
+    def take_recovered_carts(self):
+        recovered, self.recovered_carts = self.recovered_carts, {}
+        return recovered
+
+    def close_journal(self):
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+
+    @property
+    def search_index(self):
+        if self._search_index is None:
+            search_index = CatalogSearch()
+            catalog = self.catalog
+            for item_id, name in enumerate(catalog.names):
+                search_index.add(item_id, name, catalog.category_at(item_id), catalog.descriptions[item_id])
+            self._search_index = search_index
+        return self._search_index
+
+    # Each category maps to a dict used as an insertion-ordered set of item names.
+    @property
+    def categories(self):
+        if self._categories is None:
+            categories = {}
+            catalog = self.catalog
+            for item_id, name in enumerate(catalog.names):
+                categories.setdefault(catalog.category_at(item_id), {})[name] = None
+            self._categories = categories
+        return self._categories
+
+    def add_item(self, name, price, category="General", description="", sku=None):
+        self.upsert_item(name, price, category, description, sku)
+        for cart in list(self._carts.values()):
+            cart.reprice(name)
+
+    def upsert_item(self, name, price, category="General", description="", sku=None):
+        catalog = self.catalog
+        old_id = catalog.id_of(name)
+        old_category = catalog.category_at(old_id) if old_id is not None else None
+        item_id = catalog.add(name, price, category, description, sku)
+        self.price_cache.invalidate_item(name)
+        if self._search_index is not None:
+            self._search_index.add(item_id, name, category, description)
+        if self._categories is not None and old_category != category:
+            if old_category is not None:
+                members = self._categories[old_category]
+                del members[name]
+                if not members:
+                    del self._categories[old_category]
+            self._categories.setdefault(category, {})[name] = None
+        return item_id
+
+    def import_items(self, path, chunk_size=10000):
+        # Rebuilding the search index once on the next search is far cheaper
+        # than keeping it current through a bulk import.
+        self._search_index = None
+        return CatalogImporter(self, chunk_size).run(path)
+
+    def add_promotion(self, item_name, discount_type="percentage", discount_value=0, start=None, end=None):
+        previous_id = self._item_promotion_ids.pop(item_name, None)
+        if previous_id is not None:
+            self._drop_rule(previous_id)
+        promotion = Promotion(discount_type, discount_value, item=item_name, start=start, end=end)
+        promotion_id = self._add_rule(promotion, item_default=True)
+        self._item_promotion_ids[item_name] = promotion_id
         self.promotions[item_name] = {"type": discount_type, "value": discount_value}
+        return promotion_id
+
+    def add_category_promotion(self, category, discount_type="percentage", discount_value=0, start=None, end=None):
+        return self._add_rule(Promotion(discount_type, discount_value, category=category, start=start, end=end))
+
+    def add_bundle_promotion(self, item_name, buy, get, start=None, end=None):
+        return self._add_rule(Promotion("bundle", item=item_name, buy=buy, get=get, start=start, end=end))
+
+    def add_tiered_promotion(self, tiers, item_name=None, category=None, start=None, end=None):
+        return self._add_rule(Promotion("tiered", item=item_name, category=category, tiers=tiers, start=start, end=end))
+
+    def remove_promotion(self, promotion_id):
+        promotion = self._drop_rule(promotion_id)
+        if promotion is None:
+            return
+        if self._item_promotion_ids.get(promotion.item) == promotion_id:
+            del self._item_promotion_ids[promotion.item]
+            del self.promotions[promotion.item]
+        self._reprice_promotion(promotion)
+
+    def _add_rule(self, promotion, item_default=False):
+        if promotion.item is None and promotion.category is None:
+            raise ValueError("A promotion needs an item or a category.")
+        promotion_id = self.promotion_engine.add(promotion)
+        self._invalidate_prices(promotion)
+        if self.journal is not None:
+            self.journal.append(promotion_record(promotion_state(promotion), item_default))
+        self._reprice_promotion(promotion)
+        return promotion_id
+
+    def _drop_rule(self, promotion_id):
+        promotion = self.promotion_engine.remove(promotion_id)
+        if promotion is not None:
+            self._invalidate_prices(promotion)
+            if self.journal is not None:
+                self.journal.append(promotion_removal_record(promotion_id))
+        return promotion
 
-    def view_items(self):
+    def _invalidate_prices(self, promotion):
+        if promotion.item is not None:
+            self.price_cache.invalidate_item(promotion.item)
+        else:
+            self.price_cache.invalidate_category(promotion.category)
+
+    def _reprice_promotion(self, promotion):
+        for cart in list(self._carts.values()):
+            if promotion.item is not None:
+                cart.reprice(promotion.item)
+                continue
+            with cart.lock:
+                for item in list(cart):
+                    if self.catalog.category_at(self.catalog.id_of(item)) == promotion.category:
+                        cart.reprice(item)
+
+    def view_items(self, limit=None):
         if not self.items:
-            print("No items available.")
+            self.console.print("No items available.")
         else:
-            print("\nAvailable Items:")
-            for index, (item, details) in enumerate(self.items.items(), 1):
-                print(f"{index}. {item}: ₹{details['price']:.2f} - Category: {details['category']} - {details['description']}")
+            self.console.print("\nAvailable Items:")
+            shown = len(self.catalog) if limit is None else min(limit, len(self.catalog))
+            for item_id in range(shown):
+                self.print_item(item_id)
+            if shown < len(self.catalog):
+                self.console.print(f"... {len(self.catalog) - shown} more items. Type part of a name to search.")
+
+    def print_item(self, item_id):
+        catalog = self.catalog
+        self.console.print(f"{item_id + 1}. {catalog.names[item_id]}: ₹{to_rupees(catalog.prices[item_id]):.2f} - Category: {catalog.category_at(item_id)} - {catalog.descriptions[item_id]}")
+
+    def search_items(self, query, limit=20):
+        return [self.catalog.name_at(item_id) for item_id in self.search_index.search(query, limit)]
 
-    def add_to_cart(self):
+    def view_search_results(self, query, limit=20):
+        matches = self.search_index.search(query, limit)
+        if not matches:
+            self.console.print(f"No items match '{query}'.")
+            return
+        for item_id in matches:
+            self.print_item(item_id)
+
+    def add_to_cart(self, menu_limit=50):
+        self.view_items(limit=menu_limit)
         while True:
-            self.view_items()
+            entry = self.console.input("Enter the item number or a search term to add to the cart (or '0' to finish): ").strip()
+            try:
+                item_number = int(entry)
+            except ValueError:
+                if entry:
+                    self.view_search_results(entry)
+                else:
+                    self.console.print("Invalid input. Please enter a valid number.")
+                continue
             try:
-                item_number = int(input("Enter the item number to add to the cart (or '0' to finish): ").strip())
                 if item_number == 0:
                     break
 
-                if item_number < 1 or item_number > len(self.items):
-                    print("Invalid item number. Please try again.")
+                if item_number < 1 or item_number > len(self.catalog):
+                    self.console.print("Invalid item number. Please try again.")
                     continue
 
-                item_name = list(self.items.keys())[item_number - 1]
-                quantity = int(input(f"Enter quantity for {item_name}: "))
+                item_name = self.catalog.name_at(item_number - 1)
+                quantity = int(self.console.input(f"Enter quantity for {item_name}: "))
 
                 if item_name in self.cart:
                     self.cart[item_name] += quantity
                 else:
                     self.cart[item_name] = quantity
 
-                print(f"Added {quantity} of {item_name} to the cart.")
+                self.console.print(f"Added {quantity} of {item_name} to the cart.")
             except ValueError:
-                print("Invalid input. Please enter a valid number.")
+                self.console.print("Invalid input. Please enter a valid number.")
     
     def update_cart(self):
         while True:
-            item_name = input("Enter the item name to update/remove (or 'done' to finish): ").strip()
+            item_name = self.console.input("Enter the item name to update/remove (or 'done' to finish): ").strip()
             if item_name.lower() == 'done':
                 break
             if item_name in self.cart:
-                action = input(f"Do you want to 'update' or 'remove' {item_name} (current quantity: {self.cart[item_name]}): ").strip().lower()
+                action = self.console.input(f"Do you want to 'update' or 'remove' {item_name} (current quantity: {self.cart[item_name]}): ").strip().lower()
                 if action == 'update':
                     try:
-                        new_quantity = int(input(f"Enter new quantity for {item_name}: "))
+                        new_quantity = int(self.console.input(f"Enter new quantity for {item_name}: "))
                         if new_quantity <= 0:
-                            print("Quantity must be greater than 0.")
+                            self.console.print("Quantity must be greater than 0.")
                         else:
                             self.cart[item_name] = new_quantity
-                            print(f"Updated {item_name} quantity to {new_quantity}.")
+                            self.console.print(f"Updated {item_name} quantity to {new_quantity}.")
                     except ValueError:
-                        print("Invalid quantity. Please enter a valid integer.")
+                        self.console.print("Invalid quantity. Please enter a valid integer.")
                 elif action == 'remove':
                     del self.cart[item_name]
-                    print(f"Removed {item_name} from the cart.")
+                    self.console.print(f"Removed {item_name} from the cart.")
                 else:
-                    print("Invalid action. Please type 'update' or 'remove'.")
+                    self.console.print("Invalid action. Please type 'update' or 'remove'.")
             else:
-                print(f"{item_name} is not in the cart. Try again.")
-
-    def calculate_total(self):
-        total_cost = 0
-        total_discount = 0
-        for item, quantity in self.cart.items():
-            item_price = self.items[item]["price"]
-            if item in self.promotions:
-                promo = self.promotions[item]
-                if promo["type"] == "percentage":
-                    item_price *= (1 - promo["value"] / 100)
-                elif promo["type"] == "fixed":
-                    item_price -= promo["value"]
-                    item_price = max(item_price, 0)
-            total_cost += item_price * quantity
+                self.console.print(f"{item_name} is not in the cart. Try again.")
+
+    def price_line(self, item, quantity):
+        cached = self.price_cache.get(item)
+        if cached is not None:
+            unit_price, promotion = cached
+            return unit_price * quantity, promotion
+        item_id = self.catalog.id_of(item)
+        if item_id is None:
+            raise KeyError(item)
+        category = self.catalog.category_at(item_id)
+        engine = self.promotion_engine
+        if engine.is_cacheable(item, category):
+            version = self.price_cache.version(item, category)
+            unit_price, promotion = engine.price_line(item, category, self.catalog.price_at(item_id), 1)
+            self.price_cache.put(item, category, version, unit_price, promotion)
+            return unit_price * quantity, promotion
+        return engine.price_line(item, category, self.catalog.price_at(item_id), quantity)
+
+    def line_total(self, item, quantity):
+        return self.price_line(item, quantity)[0]
+
+    def effective_price(self, item):
+        return self.line_total(item, 1)
+
+    def category_of(self, item):
+        item_id = self.catalog.id_of(item)
+        if item_id is None:
+            raise KeyError(item)
+        return self.catalog.category_at(item_id)
+
+    def set_tax_rate(self, category, percentage):
+        self.tax_table.set_rate(category, percentage)
+        self.tax_table.compile(self.catalog.category_names)
+
+    def new_cart(self, cart_id=None, customer=""):
+        # Looked up per call so carts opened before enable_metrics still go through the counting wrapper.
+        cart = Cart(lambda item, quantity: self.price_line(item, quantity), self.category_of)
+        if self.journal is not None and cart_id is not None:
+            cart.journal = CartLog(self.journal, cart_id, customer)
+            cart.journal.open()
+        self._carts[id(cart)] = cart
+        return cart
+
+    def discount_on(self, total_cost):
+        return percent_of(total_cost, to_basis_points(self.discount_rate))
+
+    def refresh_prices(self, cart):
+        now = datetime.datetime.now()
+        engine = self.promotion_engine
+        if not engine.window_changes(cart.priced_at, now):
+            return
+        with cart.lock:
+            cart.priced_at = now
+            for item in list(cart):
+                if engine.has_window(item, self.category_of(item)):
+                    cart.reprice(item)
+
+    def calculate_tax(self, cart=None):
+        if cart is None:
+            cart = self.cart
+        self.refresh_prices(cart)
+        self.tax_table.set_default_rate(self.tax_rate * 100)
+        return self.tax_table.tax_lines(cart.category_totals, to_basis_points(self.discount_rate))
+
+    def calculate_total_paise(self, cart=None):
+        if cart is None:
+            cart = self.cart
+        self.refresh_prices(cart)
+        total_cost = cart.subtotal
         discountable_amount = total_cost
-        discount_amount = discountable_amount * (self.discount_rate / 100)
-        payable_amount = total_cost - discount_amount
+        discount_amount = self.discount_on(discountable_amount)
+        tax_amount = sum(central + state for _, _, central, _, state in self.calculate_tax(cart))
+        payable_amount = total_cost - discount_amount + tax_amount
         return total_cost, discountable_amount, discount_amount, payable_amount
 
-    def save_invoice_to_file(self, customer_name):
-        if not self.cart:
-            print("Your cart is empty.")
-            return
+    def calculate_total(self, cart=None):
+        return tuple(map(to_rupees, self.calculate_total_paise(cart)))
+
+    def invoice_lines(self, cart=None):
+        if cart is None:
+            cart = self.cart
+        self.refresh_prices(cart)
+        catalog = self.catalog
+        for item, quantity, total in cart.lines():
+            yield item, quantity, to_rupees(catalog.price_at(catalog.id_of(item))), to_rupees(total)
 
-        file_name = f"{customer_name.replace(' ', '_')}_invoice.txt"
+    def write_invoice(self, customer_name, cart=None):
+        if cart is None:
+            cart = self.cart
         now = datetime.datetime.now()
         date_str = now.strftime("%Y-%m-%d")
         time_str = now.strftime("%H:%M:%S")
-        
-        invoice_content = "=" * 60 + "\n"
-        invoice_content += f"ELECTRONIC STORE\t\tINVOICE\n\n"
-        invoice_content += f"Invoice: {date_str}-{time_str.replace(':', '-')}\tDate: {date_str}\n"
-        invoice_content += f"\t\t\tTime: {time_str}\n"
-        invoice_content += f"Name of Customer: {customer_name}\n"
-        invoice_content += "=" * 60 + "\n"
-        invoice_content += f"PARTICULAR\tQUANTITY\tUNIT PRICE\tTOTAL\n"
-        invoice_content += "-" * 60 + "\n"
-        
-        total_cost = 0
-        for item, quantity in self.cart.items():
-            total = self.items[item]["price"] * quantity
-            if item in self.promotions:
-                promo = self.promotions[item]
-                if promo["type"] == "percentage":
-                    total *= (1 - promo["value"] / 100)
-                elif promo["type"] == "fixed":
-                    total -= promo["value"]
-                    total = max(total, 0)
-            invoice_content += f"{item:<15} {quantity:<10} ₹{self.items[item]['price']:<10.2f} ₹{total:<10.2f}\n"
-            total_cost += total
-        
-        total_cost, discountable_amount, discount_amount, payable_amount = self.calculate_total()
-        
-        invoice_content += "-" * 60 + "\n"
-        invoice_content += f"\t\tYour discountable amount: ₹{discountable_amount:.2f}\n"
-        invoice_content += "-" * 60 + "\n"
-        invoice_content += f"\t\tYour {self.discount_rate}% discounted amount is: ₹{discount_amount:.2f}\n"
-        invoice_content += "-" * 60 + "\n"
-        invoice_content += f"\t\tYour payable amount is: ₹{payable_amount:.2f}\n"
-        invoice_content += "-" * 60 + "\n"
+        total_cost, discountable_amount, discount_amount, payable_amount = self.calculate_total(cart)
+        tax_lines = []
+        for category, central_rate, central, state_rate, state in self.calculate_tax(cart):
+            tax_lines.append(("CGST", format(to_rupees(central_rate).normalize(), "f"), category, to_rupees(central)))
+            tax_lines.append(("SGST", format(to_rupees(state_rate).normalize(), "f"), category, to_rupees(state)))
+        invoice = {
+            "number": f"{date_str}-{time_str.replace(':', '-')}",
+            "date": date_str,
+            "time": time_str,
+            "customer": customer_name,
+            "discount_rate": self.discount_rate,
+            "discountable_amount": discountable_amount,
+            "discount_amount": discount_amount,
+            "payable_amount": payable_amount,
+        }
 
-        invoice_content += f"\n\tThank You {customer_name} for your shopping.\n"
-        invoice_content += "\t\tSee you again!\n"
-        invoice_content += "=" * 60 + "\n"
+        rendered = []
+        if self.invoice_store is not None:
+            def render(number):
+                invoice["number"] = number
+                rendered.append(self.invoice_renderer.render_to_string(invoice, self.invoice_lines(cart), tax_lines))
+                return rendered[-1]
+            saved_as = self.invoice_store.add(customer_name, now, payable_amount, render)
+        else:
+            invoice["number"] = f"{invoice['number']}-{self.invoice_numbers.next()}"
+            saved_as = f"{customer_name.replace(' ', '_')}_invoice_{invoice['number']}.txt"
+            self.invoice_renderer.save(saved_as, invoice, self.invoice_lines(cart), tax_lines)
+        if self.metrics is not None:
+            self.metrics.increment("invoices_written")
+            self.metrics.increment("invoice_lines", len(cart))
+            written = len(rendered[-1].encode("utf-8")) if rendered else os.path.getsize(saved_as)
+            self.metrics.increment("invoice_bytes_written", written)
+        if self.analytics is not None:
+            self.analytics.record_invoice(saved_as, now, self.sales_lines(cart))
+        return saved_as
 
-        with open(file_name, 'w', encoding='utf-8') as file:
-            file.write(invoice_content)
+    def sales_lines(self, cart):
+        line_categories = cart.line_categories
+        line_promotions = cart.line_promotions
+        for item, quantity, total in cart.lines():
+            yield item, line_categories[item], line_promotions[item], quantity, total
 
-        print(f"\nInvoice saved to {file_name} successfully!")
+    def save_invoice_to_file(self, customer_name):
+        if not self.cart:
+            self.console.print("Your cart is empty.")
+            return
+
+        saved_as = self.write_invoice(customer_name)
+
+        if self.invoice_store is not None:
+            self.console.print(f"\nInvoice {saved_as} saved successfully!")
+            return
+        self.console.print(f"\nInvoice saved to {saved_as} successfully!")
+
+        self.past_invoices.append({"customer": customer_name, "filename": saved_as})
+
+    def save_invoices(self, orders, workers=None, use_processes=True, chunksize=64):
+        return generate_invoices(self, orders, workers, use_processes, chunksize)
 
-        self.past_invoices.append({"customer": customer_name, "filename": file_name})
+    def bill_orders(self, path):
+        biller = BatchBiller(self)
+        biller.read(path)
+        return biller.price()
+
+    def view_past_invoices(self, customer_name=None, limit=20):
+        if self.invoice_store is not None:
+            if customer_name is None:
+                invoices = self.invoice_store.recent(limit)
+            else:
+                invoices = self.invoice_store.by_customer(customer_name, limit)
+            if not invoices:
+                self.console.print("No past invoices.")
+                return
+            self.console.print("\nPast Invoices:")
+            for invoice in invoices:
+                self.console.print(f"Invoice: {invoice['number']}, Customer: {invoice['customer']}, Date: {invoice['created_at']}, Amount: ₹{invoice['payable_amount']:.2f}")
+            return
 
-    def view_past_invoices(self):
         if not self.past_invoices:
-            print("No past invoices.")
+            self.console.print("No past invoices.")
         else:
-            print("\nPast Invoices:")
+            self.console.print("\nPast Invoices:")
             for invoice in self.past_invoices:
-                print(f"Customer: {invoice['customer']}, Filename: {invoice['filename']}")
+                self.console.print(f"Customer: {invoice['customer']}, Filename: {invoice['filename']}")
 
-if __name__ == "__main__":
-    bill_system = BillSystem()
+
+def sample_bill_system(invoice_store=None):
+    bill_system = BillSystem(invoice_store=invoice_store)
 
     bill_system.add_item("APPLE SMART WATCH", 24000, category="Gadgets", description="Apple Smart Watch with advanced features.")
     bill_system.add_item("SMART WATCH", 5000, category="Gadgets", description="Basic Smart Watch with fitness tracking features.")
@@ -168,31 +565,48 @@ if __name__ == "__main__":
     bill_system.add_item("SMART SPEAKER", 7000, category="Gadgets", description="Voice-activated smart speaker with Alexa.")
 
     bill_system.add_promotion("LAPTOP", discount_type="percentage", discount_value=10)
-    
-    customer_name = input("Enter the customer's name: ").strip()
+    bill_system.set_tax_rate("Electronics", 18)
+    bill_system.set_tax_rate("Gadgets", 12)
+    return bill_system
+
+
+def run_menu(bill_system, customer_name=None):
+    console = bill_system.console
+    if customer_name is None:
+        customer_name = console.input("Enter the customer's name: ").strip()
 
     while True:
-        print("\n1. View available items")
-        print("2. Add items to cart")
-        print("3. Update or remove items in cart")
-        print("4. Save invoice to file")
-        print("5. View past invoices")
-        print("6. Exit")
+        console.print("\n1. View available items")
+        console.print("2. Add items to cart")
+        console.print("3. Update or remove items in cart")
+        console.print("4. Save invoice to file")
+        console.print("5. View past invoices")
+        console.print("6. Exit")
         
-        choice = input("Enter your choice (1-6): ").strip()
+        choice = console.input("Enter your choice (1-6): ").strip()
         
         if choice == '1':
-            bill_system.view_items()
+            timed_step(console, "view_items", bill_system.view_items)
         elif choice == '2':
-            bill_system.add_to_cart()
+            timed_step(console, "add_to_cart", bill_system.add_to_cart)
         elif choice == '3':
-            bill_system.update_cart()
+            timed_step(console, "update_cart", bill_system.update_cart)
         elif choice == '4':
-            bill_system.save_invoice_to_file(customer_name)
+            timed_step(console, "save_invoice_to_file", bill_system.save_invoice_to_file, customer_name)
         elif choice == '5':
-            bill_system.view_past_invoices()
+            timed_step(console, "view_past_invoices", bill_system.view_past_invoices)
         elif choice == '6':
-            print("Thank you for using the billing system!")
+            console.print("Thank you for using the billing system!")
             break
         else:
-            print("Invalid choice. Please try again.")
+            console.print("Invalid choice. Please try again.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the billing menu.")
+    parser.add_argument("--record", help="append every line typed at the till to this session script")
+    args = parser.parse_args()
+
+    bill_system = sample_bill_system(invoice_store=InvoiceStore("invoices.db"))
+    bill_system.console = Console(record_to=args.record)
+    run_menu(bill_system)
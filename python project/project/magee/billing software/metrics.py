@@ -0,0 +1,160 @@
+import bisect
+import functools
+import http.server
+import threading
+import time
+
+from atomic import atomic_write
+
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+PREFIX = "billing"
+
+COUNTERS = {
+    "carts_created": "Carts created.",
+    "invoices_written": "Invoices written.",
+    "invoice_lines": "Lines on written invoices.",
+    "invoice_bytes_written": "Bytes of rendered invoice text written.",
+    "promotion_lookups": "Line pricings checked against promotions.",
+    "promotion_hits": "Line pricings where a promotion applied.",
+}
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.histograms = {}
+        self.errors = {}
+        self.hooks = {}
+        self._lock = threading.Lock()
+        self._server = None
+
+    def increment(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe(self, method, seconds):
+        with self._lock:
+            histogram = self.histograms.get(method)
+            if histogram is None:
+                histogram = self.histograms[method] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def add_hook(self, method, before=None, after=None):
+        self.hooks.setdefault(method, []).append((before, after))
+
+    def timed(self, method, function):
+        clock = time.perf_counter
+        hooks = self.hooks.setdefault(method, [])
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            for before, after in hooks:
+                if before is not None:
+                    before(method, args, kwargs)
+            start = clock()
+            try:
+                result = function(*args, **kwargs)
+            except Exception:
+                with self._lock:
+                    self.errors[method] = self.errors.get(method, 0) + 1
+                raise
+            finally:
+                elapsed = clock() - start
+                self.observe(method, elapsed)
+            for before, after in hooks:
+                if after is not None:
+                    after(method, args, kwargs, result, elapsed)
+            return result
+
+        return wrapper
+
+    def render(self):
+        lines = []
+        with self._lock:
+            for name, value in self.counters.items():
+                metric = f"{PREFIX}_{name}_total"
+                lines.append(f"# HELP {metric} {COUNTERS.get(name, name)}")
+                lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric} {value}")
+            lookups = self.counters.get("promotion_lookups", 0)
+            metric = f"{PREFIX}_promotion_hit_ratio"
+            lines.append(f"# HELP {metric} Share of line pricings where a promotion applied.")
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {self.counters.get('promotion_hits', 0) / lookups if lookups else 0.0}")
+
+            metric = f"{PREFIX}_method_errors_total"
+            lines.append(f"# HELP {metric} Instrumented calls that raised.")
+            lines.append(f"# TYPE {metric} counter")
+            for method, value in self.errors.items():
+                lines.append(f'{metric}{{method="{method}"}} {value}')
+
+            metric = f"{PREFIX}_method_duration_seconds"
+            lines.append(f"# HELP {metric} Latency of instrumented BillSystem methods.")
+            lines.append(f"# TYPE {metric} histogram")
+            for method, histogram in self.histograms.items():
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{method="{method}",le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{method="{method}",le="+Inf"}} {histogram.count}')
+                lines.append(f'{metric}_sum{{method="{method}"}} {histogram.sum}')
+                lines.append(f'{metric}_count{{method="{method}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        with atomic_write(path, "w", encoding="utf-8") as file:
+            file.write(self.render())
+
+    def export_every(self, path, interval=15):
+        def run():
+            while True:
+                time.sleep(interval)
+                self.write(path)
+
+        thread = threading.Thread(target=run, name="metrics-export", daemon=True)
+        thread.start()
+        return thread
+
+    def serve(self, host="127.0.0.1", port=9100):
+        metrics = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = http.server.ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True).start()
+        return self._server.server_address[1]
+
+    def close(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
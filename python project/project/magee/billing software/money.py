@@ -0,0 +1,26 @@
+from decimal import ROUND_HALF_UP, Decimal
+
+# Amounts are held as integer paise. Percentages are held as integer basis
+# points (1/100 of a percent) and applied with round-half-up to the paisa.
+
+
+def to_paise(amount):
+    if isinstance(amount, int):
+        return amount * 100
+    return int((Decimal(str(amount)) * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def to_basis_points(percentage):
+    return to_paise(percentage)
+
+
+def to_rupees(paise):
+    return Decimal(paise).scaleb(-2)
+
+
+def percent_of(paise, basis_points):
+    return (paise * basis_points + 5000) // 10000
+
+
+def apply_percentage(paise, basis_points):
+    return paise - percent_of(paise, basis_points)
@@ -0,0 +1,70 @@
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+
+def _lock(fd):
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+
+
+def _unlock(fd):
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+class InvoiceNumberAllocator:
+    def __init__(self, path="invoice_counter", block_size=1000):
+        self.path = path
+        self.block_size = block_size
+        self._block = iter(())
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        return {"path": self.path, "block_size": self.block_size}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"], state["block_size"])
+
+    def next(self):
+        if self._pid != os.getpid():
+            self._block = iter(())
+            self._pid = os.getpid()
+        number = next(self._block, None)
+        while number is None:
+            with self._lock:
+                number = next(self._block, None)
+                if number is None:
+                    self._block = iter(range(*self.reserve()))
+                    number = next(self._block)
+        return number
+
+    def reserve(self):
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            _lock(fd)
+            try:
+                os.lseek(fd, 0, os.SEEK_SET)
+                data = os.read(fd, 64).strip()
+                start = int(data) if data else 1
+                end = start + self.block_size
+                os.lseek(fd, 0, os.SEEK_SET)
+                os.write(fd, f"{end:020d}\n".encode("ascii"))
+                os.fsync(fd)
+            finally:
+                _unlock(fd)
+        finally:
+            os.close(fd)
+        return start, end
@@ -0,0 +1,56 @@
+import concurrent.futures
+import functools
+import time
+
+_bill_system = None
+
+
+def _init_worker(bill_system):
+    global _bill_system
+    _bill_system = bill_system
+
+
+def _write_invoice(bill_system, order):
+    index, customer_name, quantities = order
+    try:
+        cart = bill_system.new_cart()
+        for item, quantity in quantities.items():
+            cart[item] = quantity
+        if not cart:
+            raise ValueError("Cart is empty.")
+        return index, customer_name, bill_system.write_invoice(customer_name, cart), None
+    except Exception as error:
+        return index, customer_name, None, f"{type(error).__name__}: {error}"
+
+
+def _write_in_worker(order):
+    return _write_invoice(_bill_system, order)
+
+
+def generate_invoices(bill_system, orders, workers=None, use_processes=True, chunksize=64):
+    tasks = ((index, customer_name, dict(cart)) for index, (customer_name, cart) in enumerate(orders))
+    if use_processes:
+        executor = concurrent.futures.ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(bill_system,))
+        write = _write_in_worker
+    else:
+        executor = concurrent.futures.ThreadPoolExecutor(workers)
+        write = functools.partial(_write_invoice, bill_system)
+        chunksize = 1
+
+    written = []
+    failures = []
+    start = time.perf_counter()
+    with executor:
+        for index, customer_name, file_name, error in executor.map(write, tasks, chunksize=chunksize):
+            if error is None:
+                written.append({"index": index, "customer": customer_name, "filename": file_name})
+            else:
+                failures.append({"index": index, "customer": customer_name, "error": error})
+    elapsed = time.perf_counter() - start
+
+    return {
+        "written": written,
+        "failures": failures,
+        "elapsed": elapsed,
+        "invoices_per_second": len(written) / elapsed if elapsed else 0.0,
+    }
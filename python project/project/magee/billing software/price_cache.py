@@ -0,0 +1,85 @@
+import collections
+import threading
+
+
+class PriceCache:
+    def __init__(self, max_size=100000):
+        self.max_size = max_size
+        self.entries = collections.OrderedDict()
+        self.item_versions = {}
+        self.category_versions = {}
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        return {"max_size": self.max_size}
+
+    def __setstate__(self, state):
+        self.__init__(state["max_size"])
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _version(self, item, category):
+        return self.generation, self.item_versions.get(item, 0), self.category_versions.get(category, 0)
+
+    def version(self, item, category):
+        with self._lock:
+            return self._version(item, category)
+
+    def get(self, item):
+        with self._lock:
+            entry = self.entries.get(item)
+            if entry is not None:
+                category, version, unit_price, promotion = entry
+                if version == self._version(item, category):
+                    self.entries.move_to_end(item)
+                    self.hits += 1
+                    return unit_price, promotion
+                del self.entries[item]
+            self.misses += 1
+            return None
+
+    def put(self, item, category, version, unit_price, promotion):
+        with self._lock:
+            # The price was computed from the state at `version`; an invalidation since then makes it stale.
+            if version != self._version(item, category):
+                return
+            self.entries[item] = (category, version, unit_price, promotion)
+            self.entries.move_to_end(item)
+            if len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate_item(self, item):
+        with self._lock:
+            self.item_versions[item] = self.item_versions.get(item, 0) + 1
+            if self.entries.pop(item, None) is not None:
+                self.invalidations += 1
+
+    def invalidate_category(self, category):
+        with self._lock:
+            self.category_versions[category] = self.category_versions.get(category, 0) + 1
+            self.invalidations += 1
+
+    def invalidate_all(self):
+        with self._lock:
+            self.generation += 1
+            self.entries.clear()
+            self.invalidations += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
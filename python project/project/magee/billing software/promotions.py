@@ -0,0 +1,167 @@
+import bisect
+import datetime
+import threading
+
+from money import apply_percentage, to_basis_points, to_paise
+
+
+class Promotion:
+    __slots__ = ("promotion_id", "type", "value", "item", "category", "buy", "get", "tiers", "start", "end",
+                 "_amount", "_tier_basis_points")
+
+    def __init__(self, type, value=0, item=None, category=None, buy=0, get=0, tiers=(), start=None, end=None):
+        self.promotion_id = None
+        self.type = type
+        self.value = value
+        self.item = item
+        self.category = category
+        self.buy = buy
+        self.get = get
+        self.tiers = tuple(sorted(tiers, reverse=True))
+        self.start = start
+        self.end = end
+        if type == "fixed":
+            self._amount = to_paise(value)
+        else:
+            self._amount = to_basis_points(value)
+        self._tier_basis_points = tuple((min_quantity, to_basis_points(percentage)) for min_quantity, percentage in self.tiers)
+
+    @property
+    def per_unit(self):
+        return self.type in ("percentage", "fixed")
+
+    def is_active(self, now):
+        if self.start is not None and now < self.start:
+            return False
+        if self.end is not None and now >= self.end:
+            return False
+        return True
+
+    def apply(self, unit_price, quantity):
+        if self.type == "percentage":
+            return apply_percentage(unit_price, self._amount) * quantity
+        if self.type == "fixed":
+            return max(unit_price - self._amount, 0) * quantity
+        if self.type == "bundle":
+            free_units = quantity // (self.buy + self.get) * self.get
+            return unit_price * (quantity - free_units)
+        if self.type == "tiered":
+            for min_quantity, basis_points in self._tier_basis_points:
+                if quantity >= min_quantity:
+                    return apply_percentage(unit_price, basis_points) * quantity
+            return unit_price * quantity
+        raise ValueError(f"Unknown promotion type: {self.type}")
+
+
+class PromotionEngine:
+    def __init__(self):
+        self.rules = {}
+        self.next_id = 1
+        self._by_item = {}
+        self._by_category = {}
+        self._boundaries = []
+        self._generation = 0
+        self._compiled_generation = 0
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def add(self, promotion):
+        if promotion.type == "bundle" and (promotion.buy < 1 or promotion.get < 1):
+            raise ValueError("Bundle promotions need buy and get of at least 1.")
+        with self._lock:
+            promotion.promotion_id = self.next_id
+            self.next_id += 1
+            self.rules[promotion.promotion_id] = promotion
+            self._generation += 1
+        return promotion.promotion_id
+
+    def restore(self, promotion):
+        with self._lock:
+            self.rules[promotion.promotion_id] = promotion
+            self.next_id = max(self.next_id, promotion.promotion_id + 1)
+            self._generation += 1
+
+    def remove(self, promotion_id):
+        with self._lock:
+            promotion = self.rules.pop(promotion_id, None)
+            self._generation += 1
+        return promotion
+
+    def compile(self):
+        with self._lock:
+            generation = self._generation
+            rules = tuple(self.rules.values())
+        now = datetime.datetime.now()
+        by_item = {}
+        by_category = {}
+        boundaries = set()
+        for promotion in rules:
+            boundaries.update(moment for moment in (promotion.start, promotion.end) if moment is not None)
+            if promotion.end is not None and promotion.end <= now:
+                continue
+            if promotion.item is not None:
+                by_item.setdefault(promotion.item, []).append(promotion)
+            else:
+                by_category.setdefault(promotion.category, []).append(promotion)
+        by_item = {item: tuple(rules) for item, rules in by_item.items()}
+        by_category = {category: tuple(rules) for category, rules in by_category.items()}
+        boundaries = sorted(boundaries)
+        with self._lock:
+            # A rule added while this index was being built bumps the generation; leave publishing to the next compile.
+            if self._generation == generation:
+                self._by_item = by_item
+                self._by_category = by_category
+                self._boundaries = boundaries
+                self._compiled_generation = generation
+
+    def candidates(self, item, category):
+        if self._compiled_generation != self._generation:
+            self.compile()
+        item_rules = self._by_item.get(item, ())
+        category_rules = self._by_category.get(category, ())
+        if not category_rules:
+            return item_rules
+        if not item_rules:
+            return category_rules
+        return item_rules + category_rules
+
+    def is_per_unit(self, item, category):
+        return all(promotion.per_unit for promotion in self.candidates(item, category))
+
+    def has_window(self, item, category):
+        return any(promotion.start is not None or promotion.end is not None
+                   for promotion in self.candidates(item, category))
+
+    def window_changes(self, since, until):
+        if self._compiled_generation != self._generation:
+            self.compile()
+        boundaries = self._boundaries
+        index = bisect.bisect_right(boundaries, since)
+        return index < len(boundaries) and boundaries[index] <= until
+
+    def is_cacheable(self, item, category):
+        return all(promotion.per_unit and promotion.start is None and promotion.end is None
+                   for promotion in self.candidates(item, category))
+
+    def price_line(self, item, category, unit_price, quantity, now=None):
+        best_total = unit_price * quantity
+        best_promotion = None
+        for promotion in self.candidates(item, category):
+            if promotion.start is not None or promotion.end is not None:
+                if now is None:
+                    now = datetime.datetime.now()
+                if not promotion.is_active(now):
+                    continue
+            total = promotion.apply(unit_price, quantity)
+            if total < best_total:
+                best_total = total
+                best_promotion = promotion
+        return best_total, best_promotion
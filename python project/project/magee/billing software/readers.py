@@ -0,0 +1,21 @@
+import csv
+import json
+
+
+def read_csv(path):
+    with open(path, newline="", encoding="utf-8") as file:
+        yield from csv.DictReader(file)
+
+
+def read_jsonl(path):
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def read_rows(path):
+    if str(path).lower().endswith((".jsonl", ".json")):
+        return read_jsonl(path)
+    return read_csv(path)
@@ -0,0 +1,163 @@
+import bisect
+import collections
+import heapq
+import re
+
+TOKEN = re.compile(r"[0-9a-z]+")
+
+
+def tokenize(text):
+    return TOKEN.findall(text.lower())
+
+
+class TrieNode:
+    __slots__ = ("children", "token", "size")
+
+    def __init__(self):
+        self.children = {}
+        self.token = None
+        self.size = 0
+
+
+class CatalogSearch:
+    def __init__(self):
+        self.postings = {}
+        self.trie = TrieNode()
+        self.item_tokens = {}
+
+    def add(self, item_id, name, category="", description=""):
+        tokens = set(tokenize(name))
+        tokens.update(tokenize(category))
+        tokens.update(tokenize(description))
+        old_tokens = self.item_tokens.get(item_id, set())
+        for token in old_tokens - tokens:
+            self._remove_posting(token, item_id)
+        for token in tokens - old_tokens:
+            self._add_posting(token, item_id)
+        self.item_tokens[item_id] = tokens
+
+    def _add_posting(self, token, item_id):
+        postings = self.postings.get(token)
+        if postings is None:
+            postings = self.postings[token] = []
+        if not postings or postings[-1] < item_id:
+            postings.append(item_id)
+        else:
+            bisect.insort(postings, item_id)
+        node = self.trie
+        node.size += 1
+        for char in token:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = TrieNode()
+            node = child
+            node.size += 1
+        node.token = token
+
+    def _remove_posting(self, token, item_id):
+        postings = self.postings[token]
+        del postings[bisect.bisect_left(postings, item_id)]
+        if not postings:
+            del self.postings[token]
+        node = self.trie
+        node.size -= 1
+        for char in token:
+            child = node.children[char]
+            child.size -= 1
+            if not child.size:
+                del node.children[char]
+                return
+            node = child
+        if not postings:
+            node.token = None
+
+    def _node(self, prefix):
+        node = self.trie
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    def complete(self, prefix, limit=None):
+        node = self._node(prefix)
+        if node is None:
+            return
+        queue = collections.deque([node])
+        found = 0
+        while queue:
+            node = queue.popleft()
+            if node.token is not None:
+                yield node.token
+                found += 1
+                if limit is not None and found >= limit:
+                    return
+            children = node.children
+            queue.extend(children[char] for char in sorted(children))
+
+    def search(self, query, limit=20):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        exact = tokens[:-1]
+        prefix = tokens[-1]
+        if not query[-1].isalnum():
+            exact.append(prefix)
+            prefix = None
+        exact_postings = []
+        for token in exact:
+            postings = self.postings.get(token)
+            if not postings:
+                return []
+            exact_postings.append((postings, token))
+
+        prefix_size = None
+        if prefix is not None:
+            node = self._node(prefix)
+            if node is None:
+                return []
+            prefix_size = node.size
+
+        if not exact_postings:
+            return self._complete_items(prefix, limit)
+
+        exact_postings.sort(key=lambda entry: len(entry[0]))
+        if prefix is None or len(exact_postings[0][0]) <= prefix_size:
+            candidates = exact_postings[0][0]
+            required = [token for postings, token in exact_postings[1:]]
+        else:
+            candidates = self._merge(self.complete(prefix))
+            required = [token for postings, token in exact_postings]
+            prefix = None
+
+        results = []
+        item_tokens = self.item_tokens
+        for item_id in candidates:
+            tokens = item_tokens[item_id]
+            if not all(token in tokens for token in required):
+                continue
+            if prefix is not None and not any(token.startswith(prefix) for token in tokens):
+                continue
+            results.append(item_id)
+            if len(results) >= limit:
+                break
+        return results
+
+    def _complete_items(self, prefix, limit):
+        results = []
+        seen = set()
+        for token in self.complete(prefix):
+            for item_id in self.postings[token]:
+                if item_id not in seen:
+                    seen.add(item_id)
+                    results.append(item_id)
+                    if len(results) >= limit:
+                        return results
+        return results
+
+    def _merge(self, tokens):
+        last = None
+        for item_id in heapq.merge(*(self.postings[token] for token in tokens)):
+            if item_id != last:
+                last = item_id
+                yield item_id
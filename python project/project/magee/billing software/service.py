@@ -0,0 +1,234 @@
+import argparse
+import asyncio
+import json
+import urllib.parse
+from http import HTTPStatus
+
+from archive import InvoiceArchive
+from invoice_store import InvoiceStore
+from main import BillSystem
+from money import to_rupees
+from sessions import SessionError, SessionLimitError, SessionManager
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _required(data, field):
+    if field not in data:
+        raise HTTPError(400, f"Missing field {field}.")
+    return data[field]
+
+
+class CheckoutService:
+    def __init__(self, bill_system, sessions=None):
+        self.bill_system = bill_system
+        self.sessions = sessions if sessions is not None else SessionManager(bill_system)
+        self.server = None
+
+    async def start(self, host="127.0.0.1", port=8080):
+        self.server = await asyncio.start_server(self.handle_connection, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self, host="127.0.0.1", port=8080):
+        await self.start(host, port)
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                body = await reader.readexactly(length) if length else b""
+
+                status, payload = await self.dispatch(method, target, body)
+                data = json.dumps(payload).encode("utf-8")
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                writer.write(
+                    f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, target, body):
+        url = urllib.parse.urlsplit(target)
+        parts = [urllib.parse.unquote(part) for part in url.path.strip("/").split("/") if part]
+        query = dict(urllib.parse.parse_qsl(url.query))
+        try:
+            data = json.loads(body) if body else {}
+            if not isinstance(data, dict):
+                raise HTTPError(400, "The request body must be a JSON object.")
+            return HTTPStatus.OK, await self.route(method, parts, query, data)
+        except HTTPError as error:
+            return HTTPStatus(error.status), {"error": error.message}
+        except SessionError as error:
+            return HTTPStatus.NOT_FOUND, {"error": f"Unknown session {error.args[0]}."}
+        except KeyError as error:
+            return HTTPStatus.NOT_FOUND, {"error": f"Unknown item {error.args[0]}."}
+        except (ValueError, TypeError) as error:
+            return HTTPStatus.BAD_REQUEST, {"error": str(error)}
+        except SessionLimitError as error:
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"error": str(error)}
+        except Exception as error:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"{type(error).__name__}: {error}"}
+
+    async def route(self, method, parts, query, data):
+        path = f"/{'/'.join(parts)}"
+        if parts[:1] == ["items"] and len(parts) <= 2:
+            if method != "GET":
+                raise HTTPError(405, f"Method {method} not allowed on {path}.")
+            if len(parts) == 1:
+                return self.list_items(query)
+            return self.item(int(parts[1]))
+        if parts[:1] == ["sessions"] and len(parts) <= 4:
+            sessions = self.sessions
+            session_id = parts[1] if len(parts) > 1 else None
+            resource = parts[2] if len(parts) > 2 else None
+            if len(parts) == 1:
+                if method == "POST":
+                    return {"session_id": sessions.open(data.get("customer", ""))}
+            elif len(parts) == 2:
+                if method == "GET":
+                    return self.session(session_id)
+                if method == "DELETE":
+                    if sessions.close(session_id) is None:
+                        raise SessionError(session_id)
+                    return {"closed": session_id}
+            elif resource == "items" and len(parts) == 3:
+                if method == "POST":
+                    item = _required(data, "item")
+                    quantity = sessions.add(session_id, item, int(data.get("quantity", 1)))
+                    return {"item": item, "quantity": quantity}
+            elif resource == "items":
+                if method == "PUT":
+                    quantity = int(_required(data, "quantity"))
+                    sessions.update(session_id, parts[3], quantity)
+                    return {"item": parts[3], "quantity": quantity}
+                if method == "DELETE":
+                    sessions.remove(session_id, parts[3])
+                    return {"removed": parts[3]}
+            elif resource == "total" and len(parts) == 3:
+                if method == "GET":
+                    return self.totals(session_id)
+            elif resource == "invoice" and len(parts) == 3:
+                if method == "POST":
+                    loop = asyncio.get_running_loop()
+                    saved_as = await loop.run_in_executor(None, sessions.checkout, session_id, data.get("customer"))
+                    return {"invoice": saved_as}
+            else:
+                raise HTTPError(404, f"No route for {method} {path}.")
+            raise HTTPError(405, f"Method {method} not allowed on {path}.")
+        raise HTTPError(404, f"No route for {method} {path}.")
+
+    def item(self, item_id):
+        catalog = self.bill_system.catalog
+        if not 0 <= item_id < len(catalog):
+            raise HTTPError(404, f"Unknown item {item_id}.")
+        return {"id": item_id, "name": catalog.names[item_id], "price": float(to_rupees(catalog.prices[item_id])),
+                "category": catalog.category_at(item_id), "description": catalog.descriptions[item_id],
+                "sku": catalog.skus[item_id]}
+
+    def list_items(self, query):
+        limit = min(int(query.get("limit", 50)), 500)
+        if query.get("q"):
+            item_ids = self.bill_system.search_index.search(query["q"], limit)
+        else:
+            offset = int(query.get("offset", 0))
+            item_ids = range(offset, min(offset + limit, len(self.bill_system.catalog)))
+        return {"items": [self.item(item_id) for item_id in item_ids]}
+
+    def totals(self, session_id):
+        total_cost, discountable_amount, discount_amount, payable_amount = self.sessions.totals(session_id)
+        return {"total_cost": float(total_cost), "discountable_amount": float(discountable_amount),
+                "discount_amount": float(discount_amount), "payable_amount": float(payable_amount)}
+
+    def session(self, session_id):
+        session = self.sessions.get(session_id)
+        with session.cart.lock:
+            totals = self.totals(session_id)
+            lines = [{"item": item, "quantity": quantity, "total": float(to_rupees(total))}
+                     for item, quantity, total in session.cart.lines()]
+        return {"session_id": session_id, "customer": session.customer_name, "lines": lines, **totals}
+
+
+class CheckoutClient:
+    def __init__(self, host="127.0.0.1", port=8080):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            await self.writer.wait_closed()
+            self.writer = None
+
+    async def request(self, method, path, payload=None):
+        if self.writer is None:
+            await self.connect()
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        self.writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+        )
+        await self.writer.drain()
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        return status, json.loads(await self.reader.readexactly(length))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the billing system over HTTP/JSON.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--snapshot", help="catalog snapshot written by BillSystem.save_snapshot")
+    parser.add_argument("--store", default="invoices.db", help="SQLite invoice store")
+    parser.add_argument("--archive", help="directory of a compressed invoice archive to use instead of --store")
+    args = parser.parse_args()
+
+    store = InvoiceArchive(args.archive) if args.archive else InvoiceStore(args.store)
+    if args.snapshot:
+        bill_system = BillSystem.from_snapshot(args.snapshot, invoice_store=store)
+    else:
+        bill_system = BillSystem(invoice_store=store)
+    print(f"Serving checkout on http://{args.host}:{args.port}")
+    asyncio.run(CheckoutService(bill_system).serve_forever(args.host, args.port))
@@ -0,0 +1,141 @@
+import collections
+import contextlib
+import threading
+import time
+import uuid
+
+
+class SessionError(KeyError):
+    pass
+
+
+class SessionLimitError(RuntimeError):
+    pass
+
+
+class Session:
+    __slots__ = ("session_id", "customer_name", "cart", "last_used", "closed")
+
+    def __init__(self, session_id, customer_name, cart):
+        self.session_id = session_id
+        self.customer_name = customer_name
+        self.cart = cart
+        self.last_used = time.monotonic()
+        self.closed = False
+
+
+class SessionManager:
+    def __init__(self, bill_system, idle_timeout=900, max_sessions=1000, max_lines=500):
+        self.bill_system = bill_system
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self.max_lines = max_lines
+        self.sessions = collections.OrderedDict()
+        self._lock = threading.Lock()
+        for session_id, saved in bill_system.take_recovered_carts().items():
+            cart = bill_system.new_cart(session_id, saved["customer"])
+            cart.add_many(saved["lines"].items())
+            self.sessions[session_id] = Session(session_id, saved["customer"], cart)
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def open(self, customer_name="", session_id=None):
+        if session_id is None:
+            session_id = uuid.uuid4().hex
+        with self._lock:
+            if session_id in self.sessions:
+                raise ValueError(f"Session {session_id} is already open.")
+            if len(self.sessions) >= self.max_sessions:
+                self._evict_idle(time.monotonic())
+                if len(self.sessions) >= self.max_sessions:
+                    raise SessionLimitError("Too many open sessions.")
+            cart = self.bill_system.new_cart(session_id, customer_name)
+            self.sessions[session_id] = Session(session_id, customer_name, cart)
+        return session_id
+
+    def get(self, session_id):
+        with self._lock:
+            session = self.sessions.get(session_id)
+            if session is None:
+                raise SessionError(session_id)
+            session.last_used = time.monotonic()
+            self.sessions.move_to_end(session_id)
+        return session
+
+    def close(self, session_id):
+        with self._lock:
+            session = self.sessions.pop(session_id, None)
+        if session is not None:
+            session.closed = True
+            if session.cart.journal is not None:
+                session.cart.journal.close()
+        return session
+
+    def evict_idle(self):
+        with self._lock:
+            return self._evict_idle(time.monotonic())
+
+    def _evict_idle(self, now):
+        evicted = 0
+        while self.sessions:
+            session = next(iter(self.sessions.values()))
+            if now - session.last_used < self.idle_timeout:
+                break
+            del self.sessions[session.session_id]
+            session.closed = True
+            if session.cart.journal is not None:
+                session.cart.journal.close()
+            evicted += 1
+        return evicted
+
+    # Holds the cart lock and re-checks that checkout or close has not taken the session away meanwhile.
+    @contextlib.contextmanager
+    def _locked(self, session_id):
+        session = self.get(session_id)
+        with session.cart.lock:
+            if session.closed:
+                raise SessionError(session_id)
+            yield session
+
+    def add(self, session_id, item, quantity):
+        if quantity <= 0:
+            raise ValueError("Quantity must be greater than 0.")
+        with self._locked(session_id) as session:
+            cart = session.cart
+            if item not in cart and len(cart) >= self.max_lines:
+                raise ValueError(f"A cart can hold at most {self.max_lines} lines.")
+            cart.add(item, quantity)
+            return cart[item]
+
+    def update(self, session_id, item, quantity):
+        if quantity <= 0:
+            raise ValueError("Quantity must be greater than 0.")
+        with self._locked(session_id) as session:
+            cart = session.cart
+            if item not in cart:
+                raise KeyError(item)
+            cart[item] = quantity
+
+    def remove(self, session_id, item):
+        with self._locked(session_id) as session:
+            del session.cart[item]
+
+    def totals(self, session_id):
+        with self._locked(session_id) as session:
+            return self.bill_system.calculate_total(session.cart)
+
+    def checkout(self, session_id, customer_name=None):
+        with self._locked(session_id) as session:
+            if not session.cart:
+                raise ValueError("Your cart is empty.")
+            # Marked closed under the lock so nothing can change the cart, then written without holding the lock
+            # so requests for this session on the event loop are not stuck behind the invoice write.
+            session.closed = True
+        try:
+            saved_as = self.bill_system.write_invoice(customer_name or session.customer_name, session.cart)
+        except BaseException:
+            session.closed = False
+            raise
+        self.close(session_id)
+        return saved_as
@@ -0,0 +1,163 @@
+import bisect
+import datetime
+import json
+import mmap
+import struct
+from array import array
+from collections.abc import Sequence
+
+from atomic import atomic_write
+from catalog import Catalog
+
+MAGIC = b"BILLSNAP"
+VERSION = 2
+HEADER = struct.Struct("<8sIIQ")
+SECTION = struct.Struct("<QQ")
+SECTIONS = ("prices", "category_ids", "name_offsets", "names", "description_offsets", "descriptions",
+            "sku_offsets", "skus", "names_sorted", "skus_sorted", "meta")
+
+
+class PackedStrings(Sequence):
+    __slots__ = ("offsets", "blob", "empty")
+
+    def __init__(self, offsets, blob, empty=""):
+        self.offsets = offsets
+        self.blob = blob
+        self.empty = empty
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        start = self.offsets[index]
+        end = self.offsets[index + 1]
+        if start == end:
+            return self.empty
+        return str(self.blob[start:end], "utf-8")
+
+
+class PackedIndex:
+    __slots__ = ("ids", "keys")
+
+    def __init__(self, ids, keys):
+        self.ids = ids
+        self.keys = keys
+
+    def get(self, key, default=None):
+        ids = self.ids
+        position = bisect.bisect_left(ids, key, key=self.keys.__getitem__)
+        if position < len(ids) and self.keys[ids[position]] == key:
+            return ids[position]
+        return default
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+
+def _pack_strings(strings):
+    offsets = array("q", [0])
+    chunks = []
+    end = 0
+    for string in strings:
+        data = (string or "").encode("utf-8")
+        chunks.append(data)
+        end += len(data)
+        offsets.append(end)
+    return offsets.tobytes(), b"".join(chunks)
+
+
+def promotion_state(promotion):
+    state = {slot: getattr(promotion, slot) for slot in promotion.__slots__ if not slot.startswith("_")}
+    state["tiers"] = [list(tier) for tier in promotion.tiers]
+    for key in ("start", "end"):
+        if state[key] is not None:
+            state[key] = state[key].isoformat()
+    return state
+
+
+def restore_promotion(promotion_class, state):
+    state = dict(state)
+    promotion_id = state.pop("promotion_id")
+    for key in ("start", "end"):
+        if state[key] is not None:
+            state[key] = datetime.datetime.fromisoformat(state[key])
+    promotion = promotion_class(**state)
+    promotion.promotion_id = promotion_id
+    return promotion
+
+
+def write_snapshot(path, catalog, promotion_engine, item_promotion_ids, tax_table):
+    count = len(catalog)
+    names = list(catalog.names)
+    skus = list(catalog.skus)
+    name_offsets, name_blob = _pack_strings(names)
+    description_offsets, description_blob = _pack_strings(catalog.descriptions)
+    sku_offsets, sku_blob = _pack_strings(skus)
+    names_sorted = array("i", sorted(range(count), key=names.__getitem__))
+    skus_sorted = array("i", sorted((item_id for item_id in range(count) if skus[item_id]), key=skus.__getitem__))
+    meta = {
+        "categories": list(catalog.category_names),
+        "promotions": [promotion_state(promotion) for promotion in promotion_engine.rules.values()],
+        "next_promotion_id": promotion_engine.next_id,
+        "item_promotion_ids": item_promotion_ids,
+        "tax_slabs": tax_table.slabs,
+    }
+    sections = [
+        array("q", catalog.prices).tobytes(),
+        array("i", catalog.category_ids).tobytes(),
+        name_offsets, name_blob,
+        description_offsets, description_blob,
+        sku_offsets, sku_blob,
+        names_sorted.tobytes(), skus_sorted.tobytes(),
+        json.dumps(meta).encode("utf-8"),
+    ]
+
+    offset = HEADER.size + SECTION.size * len(sections)
+    table = []
+    for data in sections:
+        offset += -offset % 8
+        table.append((offset, len(data)))
+        offset += len(data)
+
+    with atomic_write(path) as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(sections), count))
+        for entry in table:
+            file.write(SECTION.pack(*entry))
+        for (offset, length), data in zip(table, sections):
+            file.write(b"\0" * (offset - file.tell()))
+            file.write(data)
+
+
+def read_snapshot(path):
+    with open(path, "rb") as file:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapped)
+    magic, version, section_count, count = HEADER.unpack_from(view)
+    if magic != MAGIC or version != VERSION or section_count != len(SECTIONS):
+        raise ValueError(f"{path} is not a version {VERSION} catalog snapshot.")
+    sections = {}
+    for index, name in enumerate(SECTIONS):
+        offset, length = SECTION.unpack_from(view, HEADER.size + index * SECTION.size)
+        sections[name] = view[offset:offset + length]
+    meta = json.loads(str(sections["meta"], "utf-8"))
+
+    catalog = Catalog()
+    catalog.names = PackedStrings(sections["name_offsets"].cast("q"), sections["names"])
+    catalog.prices = sections["prices"].cast("q")
+    catalog.category_ids = sections["category_ids"].cast("i")
+    catalog.descriptions = PackedStrings(sections["description_offsets"].cast("q"), sections["descriptions"])
+    catalog.skus = PackedStrings(sections["sku_offsets"].cast("q"), sections["skus"], empty=None)
+    catalog.category_names = meta["categories"]
+    catalog._category_index = {category: category_id for category_id, category in enumerate(meta["categories"])}
+    catalog._name_index = PackedIndex(sections["names_sorted"].cast("i"), catalog.names)
+    catalog._sku_index = PackedIndex(sections["skus_sorted"].cast("i"), catalog.skus)
+    catalog._source = (map_catalog, path)
+    return catalog, meta
+
+
+def map_catalog(path):
+    return read_snapshot(path)[0]
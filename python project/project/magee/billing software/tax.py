@@ -0,0 +1,51 @@
+from money import to_basis_points
+
+SCALE = 10000 * 10000
+
+
+class TaxTable:
+    def __init__(self, default_rate=10):
+        self.default_rate = default_rate
+        self.slabs = {}
+        self._rates = {}
+
+    def set_rate(self, category, percentage):
+        self.slabs[category] = percentage
+        self._rates.pop(category, None)
+
+    def set_default_rate(self, percentage):
+        if percentage != self.default_rate:
+            self.default_rate = percentage
+            self._rates.clear()
+
+    def compile(self, categories):
+        self._rates = {category: self._split(category) for category in categories}
+
+    def _split(self, category):
+        basis_points = to_basis_points(self.slabs.get(category, self.default_rate))
+        central = basis_points // 2
+        return central, basis_points - central
+
+    def rates(self, category):
+        rates = self._rates.get(category)
+        if rates is None:
+            rates = self._rates[category] = self._split(category)
+        return rates
+
+    def tax_lines(self, category_totals, discount_basis_points):
+        lines = []
+        for category, subtotal in category_totals.items():
+            if subtotal <= 0:
+                continue
+            central, state = self.rates(category)
+            if not central and not state:
+                continue
+            taxable = subtotal * (10000 - discount_basis_points)
+            lines.append((
+                category,
+                central,
+                (taxable * central + SCALE // 2) // SCALE,
+                state,
+                (taxable * state + SCALE // 2) // SCALE,
+            ))
+        return lines
@@ -0,0 +1,50 @@
+import datetime
+import os
+import tempfile
+import unittest
+
+from archive import INDEX_RECORD, InvoiceArchive
+from main import BillSystem
+
+
+class InvoiceArchiveTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.archive = InvoiceArchive(os.path.join(self.directory.name, "archive"))
+        self.addCleanup(self.archive.close)
+
+    def test_forked_workers_allocate_distinct_numbers(self):
+        bill_system = BillSystem(invoice_store=self.archive)
+        bill_system.add_item("PEN", 10)
+        orders = [(f"customer {index}", {"PEN": index % 3 + 1}) for index in range(200)]
+        # Opening the archive in the parent first is what used to leak the index file into the workers.
+        bill_system.save_invoices(orders[:1], use_processes=False)
+
+        result = bill_system.save_invoices(orders, workers=4, use_processes=True)
+
+        self.assertEqual(result["failures"], [])
+        numbers = [invoice["filename"] for invoice in result["written"]]
+        self.assertEqual(len(set(numbers)), len(orders))
+        for number, (customer, cart) in zip(numbers, orders):
+            invoice = self.archive.get(number)
+            self.assertIsNotNone(invoice, number)
+            self.assertEqual(invoice["customer"], customer)
+        self.assertEqual(self.archive.count(), len(orders) + 1)
+
+    def test_torn_index_record_is_truncated(self):
+        created_at = datetime.datetime(2025, 1, 1, 12, 0, 0)
+        first = self.archive.add("first", created_at, 10, lambda number: f"invoice {number}")
+        with open(os.path.join(self.archive.directory, "index"), "ab") as index:
+            index.write(b"\0" * (INDEX_RECORD.size // 2))
+
+        second = self.archive.add("second", created_at, 20, lambda number: f"invoice {number}")
+
+        self.assertEqual(second, "2025-01-01-12-00-00-2")
+        self.assertEqual(self.archive.get(first)["content"], f"invoice {first}")
+        self.assertEqual(self.archive.get(second)["content"], f"invoice {second}")
+        self.assertEqual(self.archive.count(), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
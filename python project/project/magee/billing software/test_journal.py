@@ -0,0 +1,103 @@
+import os
+import tempfile
+import unittest
+from decimal import Decimal
+
+from main import BillSystem
+from sessions import SessionManager
+from wal import SET, CartJournal, encode_record
+
+
+def build():
+    bill_system = BillSystem()
+    bill_system.add_item("LAPTOP", 50000, "Electronics")
+    bill_system.add_item("PEN", 10, "Stationery")
+    bill_system.add_promotion("LAPTOP", "percentage", 10)
+    return bill_system
+
+
+class CartJournalTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, "journal")
+
+    def crash_after(self, work):
+        # The child dies without closing the journal, like a till losing power after its last fsync.
+        pid = os.fork()
+        if pid == 0:
+            try:
+                bill_system = build()
+                bill_system.enable_journal(self.path)
+                work(bill_system, SessionManager(bill_system))
+                bill_system.journal.sync()
+            finally:
+                os._exit(0)
+        self.assertEqual(os.waitpid(pid, 0)[1], 0)
+
+    def recover(self):
+        bill_system = build()
+        bill_system.enable_journal(self.path)
+        self.addCleanup(bill_system.close_journal)
+        return bill_system, SessionManager(bill_system)
+
+    def last_segment(self):
+        return os.path.join(self.path, max(name for name in os.listdir(self.path) if name.startswith("wal-")))
+
+    @unittest.skipUnless(hasattr(os, "fork"), "needs os.fork")
+    def test_crash_replays_carts_and_promotions(self):
+        def work(bill_system, sessions):
+            bill_system.remove_promotion(1)
+            bill_system.add_category_promotion("Stationery", "fixed", 1)
+            bill_system.cart.add("PEN", 1)
+            sessions.open("ann", "s1")
+            sessions.add("s1", "LAPTOP", 2)
+            sessions.add("s1", "PEN", 3)
+            sessions.open("bob", "s2")
+            sessions.add("s2", "PEN", 5)
+            sessions.close("s2")
+
+        self.crash_after(work)
+        bill_system, sessions = self.recover()
+
+        self.assertEqual(sorted(bill_system.promotion_engine.rules), [2])
+        self.assertEqual(dict(bill_system.cart), {"PEN": 1})
+        self.assertEqual(list(sessions.sessions), ["s1"])
+        self.assertEqual(sessions.get("s1").customer_name, "ann")
+        self.assertEqual(dict(sessions.get("s1").cart), {"LAPTOP": 2, "PEN": 3})
+        self.assertEqual(sessions.totals("s1")[0], Decimal("100027.00"))
+
+    @unittest.skipUnless(hasattr(os, "fork"), "needs os.fork")
+    def test_torn_tail_is_ignored(self):
+        def work(bill_system, sessions):
+            sessions.open("ann", "s1")
+            sessions.add("s1", "PEN", 3)
+
+        self.crash_after(work)
+        with open(self.last_segment(), "ab") as segment:
+            segment.write(encode_record(SET, "s1", "PEN", 99)[:-2])
+        bill_system, sessions = self.recover()
+
+        self.assertEqual(dict(sessions.get("s1").cart), {"PEN": 3})
+
+    def test_checkpoint_keeps_state_and_drops_old_segments(self):
+        bill_system = build()
+        journal = bill_system.enable_journal(self.path)
+        sessions = SessionManager(bill_system)
+        sessions.open("ann", "s1")
+        sessions.add("s1", "LAPTOP", 1)
+        journal.checkpoint()
+        sessions.add("s1", "PEN", 4)
+        journal.sync()
+        bill_system.close_journal()
+
+        names = sorted(os.listdir(self.path))
+        self.assertEqual([name for name in names if name.startswith("snapshot-")], [f"snapshot-{journal.segment:08d}.json"])
+        self.assertTrue(all(int(name[4:12]) >= journal.segment for name in names if name.startswith("wal-")))
+        state = CartJournal(self.path).recover()
+        self.assertEqual(state["carts"]["s1"], {"customer": "ann", "lines": {"LAPTOP": 1, "PEN": 4}})
+        self.assertEqual(sorted(state["promotions"]), [1])
+
+
+if __name__ == "__main__":
+    unittest.main()
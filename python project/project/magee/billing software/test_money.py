@@ -0,0 +1,38 @@
+import unittest
+from decimal import Decimal
+
+from money import apply_percentage, percent_of, to_basis_points, to_paise, to_rupees
+
+
+class MoneyTest(unittest.TestCase):
+    def test_to_paise_rounds_half_up(self):
+        self.assertEqual(to_paise(70000), 7000000)
+        self.assertEqual(to_paise(19.99), 1999)
+        self.assertEqual(to_paise(0.1 + 0.2), 30)
+        self.assertEqual(to_paise(1.005), 101)
+        self.assertEqual(to_paise(1.004), 100)
+        self.assertEqual(to_paise("2.675"), 268)
+        self.assertEqual(to_paise(Decimal("0.005")), 1)
+
+    def test_to_rupees_is_exact(self):
+        self.assertEqual(to_rupees(12345), Decimal("123.45"))
+        self.assertEqual(str(to_rupees(7000000)), "70000.00")
+        self.assertEqual(to_basis_points(12.5), 1250)
+
+    def test_percent_of_rounds_half_up_to_the_paisa(self):
+        self.assertEqual(percent_of(1, 5000), 1)
+        self.assertEqual(percent_of(3, 5000), 2)
+        self.assertEqual(percent_of(1, 4999), 0)
+        self.assertEqual(percent_of(999, 1000), 100)
+        self.assertEqual(percent_of(12345, 1800), 2222)
+        self.assertEqual(percent_of(7000000, 10000), 7000000)
+
+    def test_apply_percentage_takes_the_rounded_discount(self):
+        self.assertEqual(apply_percentage(999, 1000), 899)
+        self.assertEqual(apply_percentage(3, 5000), 1)
+        self.assertEqual(apply_percentage(7000000, 5000), 3500000)
+        self.assertEqual(apply_percentage(1999, 0), 1999)
+
+
+if __name__ == "__main__":
+    unittest.main()
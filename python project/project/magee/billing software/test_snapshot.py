@@ -0,0 +1,65 @@
+import datetime
+import os
+import tempfile
+import unittest
+
+from main import BillSystem, sample_bill_system
+from snapshot import promotion_state
+
+
+class SnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, "catalog.snap")
+
+    def round_trip(self, bill_system):
+        bill_system.save_snapshot(self.path)
+        return BillSystem.from_snapshot(self.path)
+
+    def test_round_trip_keeps_catalog(self):
+        source = BillSystem()
+        source.add_item("LAPTOP", 49999.99, "Electronics", "Thin and light.", sku="LP-1")
+        source.add_item("PEN", 10)
+        source.add_item("ÉCLAIR", 0.5, "Bakery", "")
+
+        loaded = self.round_trip(source)
+
+        self.assertEqual(list(loaded.catalog.names), ["LAPTOP", "PEN", "ÉCLAIR"])
+        self.assertEqual(list(loaded.catalog.prices), [4999999, 1000, 50])
+        self.assertEqual(loaded.items["LAPTOP"], source.items["LAPTOP"])
+        self.assertEqual(loaded.items["ÉCLAIR"], source.items["ÉCLAIR"])
+        self.assertEqual(loaded.catalog.id_of_sku("LP-1"), 0)
+        self.assertIsNone(loaded.catalog.id_of_sku("missing"))
+        self.assertEqual(loaded.category_of("PEN"), "General")
+
+    def test_round_trip_keeps_promotions_and_tax_slabs(self):
+        source = sample_bill_system()
+        end = datetime.datetime.now() + datetime.timedelta(days=1)
+        source.add_category_promotion("Gadgets", "fixed", 500, end=end)
+        source.add_bundle_promotion("LAPTOP", buy=2, get=1)
+        removed = source.add_category_promotion("Electronics", "percentage", 90)
+        source.remove_promotion(removed)
+        source.set_tax_rate("Gadgets", 5)
+
+        loaded = self.round_trip(source)
+
+        self.assertEqual({promotion_id: promotion_state(promotion)
+                          for promotion_id, promotion in loaded.promotion_engine.rules.items()},
+                         {promotion_id: promotion_state(promotion)
+                          for promotion_id, promotion in source.promotion_engine.rules.items()})
+        self.assertEqual(loaded.promotions, source.promotions)
+        self.assertEqual(loaded.tax_table.slabs, source.tax_table.slabs)
+        totals = []
+        for system in (source, loaded):
+            cart = system.new_cart()
+            cart["LAPTOP"] = 3
+            cart["SMART WATCH"] = 2
+            cart["PHONE"] = 1
+            totals.append(system.calculate_total(cart))
+        self.assertEqual(totals[1], totals[0])
+        self.assertGreater(loaded.add_category_promotion("Gadgets", "fixed", 1), removed)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,221 @@
+import json
+import os
+import struct
+import threading
+import zlib
+
+from atomic import atomic_write
+
+OPEN, CLOSE, SET, REMOVE, CLEAR, PROMOTION_ADD, PROMOTION_REMOVE = range(1, 8)
+RECORD = struct.Struct("<IIBqH")
+
+
+def encode_record(op, cart_id="", text="", number=0):
+    cart = cart_id.encode("utf-8")
+    body = cart + text.encode("utf-8")
+    header = RECORD.pack(0, len(body), op, number, len(cart))
+    crc = zlib.crc32(body, zlib.crc32(header[4:]))
+    return struct.pack("<I", crc) + header[4:] + body
+
+
+def read_records(path):
+    with open(path, "rb") as file:
+        data = file.read()
+    position = 0
+    while position + RECORD.size <= len(data):
+        crc, length, op, number, cart_length = RECORD.unpack_from(data, position)
+        start = position + RECORD.size
+        body = data[start:start + length]
+        if len(body) < length or zlib.crc32(body, zlib.crc32(data[position + 4:start])) != crc:
+            break
+        yield op, str(body[:cart_length], "utf-8"), str(body[cart_length:], "utf-8"), number
+        position = start + length
+
+
+def _write_atomically(path, data):
+    with atomic_write(path) as file:
+        file.write(data)
+
+
+class CartLog:
+    __slots__ = ("journal", "cart_id", "customer")
+
+    def __init__(self, journal, cart_id, customer=""):
+        self.journal = journal
+        self.cart_id = cart_id
+        self.customer = customer
+
+    def open(self):
+        self.journal.append(encode_record(OPEN, self.cart_id, self.customer))
+
+    def set(self, item, quantity):
+        self.journal.append(encode_record(SET, self.cart_id, item, quantity))
+
+    def remove(self, item):
+        self.journal.append(encode_record(REMOVE, self.cart_id, item))
+
+    def clear(self):
+        self.journal.append(encode_record(CLEAR, self.cart_id))
+
+    def close(self):
+        self.journal.append(encode_record(CLOSE, self.cart_id))
+
+
+def promotion_record(state, item_default=False):
+    return encode_record(PROMOTION_ADD, text=json.dumps({"promotion": state, "item_default": item_default}))
+
+
+def promotion_removal_record(promotion_id):
+    return encode_record(PROMOTION_REMOVE, number=promotion_id)
+
+
+class CartJournal:
+    def __init__(self, directory, flush_interval=0.005, snapshot_every=50000, state_provider=None):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.snapshot_every = snapshot_every
+        self.state_provider = state_provider
+        self.segment = None
+        self._file = None
+        self._buffer = bytearray()
+        self._appended = 0
+        self._durable = 0
+        self._since_snapshot = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._durable_condition = threading.Condition()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._thread = None
+        os.makedirs(directory, exist_ok=True)
+
+    def _files(self, prefix, suffix):
+        numbers = []
+        for name in os.listdir(self.directory):
+            if name.startswith(prefix) and name.endswith(suffix):
+                try:
+                    numbers.append(int(name[len(prefix):-len(suffix)]))
+                except ValueError:
+                    pass
+        return sorted(numbers)
+
+    def _segment_path(self, number):
+        return os.path.join(self.directory, f"wal-{number:08d}.log")
+
+    def _snapshot_path(self, number):
+        return os.path.join(self.directory, f"snapshot-{number:08d}.json")
+
+    def recover(self):
+        state = {"carts": {}, "promotions": {}, "removed_promotions": set(), "promotions_complete": False}
+        snapshots = self._files("snapshot-", ".json")
+        first_segment = 0
+        if snapshots:
+            first_segment = snapshots[-1]
+            with open(self._snapshot_path(first_segment), encoding="utf-8") as file:
+                saved = json.load(file)
+            state["carts"] = {cart_id: {"customer": cart["customer"], "lines": cart["lines"]}
+                              for cart_id, cart in saved["carts"].items()}
+            state["promotions"] = {saved_promotion["promotion"]["promotion_id"]: saved_promotion
+                                   for saved_promotion in saved["promotions"]}
+            state["promotions_complete"] = True
+
+        carts = state["carts"]
+        promotions = state["promotions"]
+        for number in self._files("wal-", ".log"):
+            if number < first_segment:
+                continue
+            for op, cart_id, text, value in read_records(self._segment_path(number)):
+                if op == SET:
+                    carts.setdefault(cart_id, {"customer": "", "lines": {}})["lines"][text] = value
+                elif op == REMOVE:
+                    if cart_id in carts:
+                        carts[cart_id]["lines"].pop(text, None)
+                elif op == CLEAR:
+                    if cart_id in carts:
+                        carts[cart_id]["lines"].clear()
+                elif op == OPEN:
+                    carts.setdefault(cart_id, {"customer": text, "lines": {}})["customer"] = text
+                elif op == CLOSE:
+                    carts.pop(cart_id, None)
+                elif op == PROMOTION_ADD:
+                    saved_promotion = json.loads(text)
+                    promotion_id = saved_promotion["promotion"]["promotion_id"]
+                    promotions[promotion_id] = saved_promotion
+                    state["removed_promotions"].discard(promotion_id)
+                elif op == PROMOTION_REMOVE:
+                    promotions.pop(value, None)
+                    state["removed_promotions"].add(value)
+        return state
+
+    def start(self):
+        segments = self._files("wal-", ".log")
+        snapshots = self._files("snapshot-", ".json")
+        self.segment = max(segments[-1:] + snapshots[-1:], default=0) + 1
+        self._file = open(self._segment_path(self.segment), "ab")
+        self._thread = threading.Thread(target=self._run, name="cart-journal", daemon=True)
+        self._thread.start()
+
+    def append(self, record):
+        with self._lock:
+            self._buffer += record
+            self._appended += 1
+            return self._appended
+
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+            if self.state_provider is not None and self._since_snapshot >= self.snapshot_every:
+                self.checkpoint()
+
+    def flush(self):
+        with self._flush_lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        with self._lock:
+            data = self._buffer
+            appended = self._appended
+            self._buffer = bytearray()
+        if data:
+            self._file.write(data)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._since_snapshot += appended - self._durable
+        with self._durable_condition:
+            self._durable = appended
+            self._durable_condition.notify_all()
+
+    def sync(self, timeout=None):
+        with self._lock:
+            target = self._appended
+        self._wakeup.set()
+        with self._durable_condition:
+            return self._durable_condition.wait_for(lambda: self._durable >= target, timeout)
+
+    def checkpoint(self):
+        with self._flush_lock:
+            self._flush_locked()
+            old_file = self._file
+            self.segment += 1
+            self._file = open(self._segment_path(self.segment), "ab")
+            old_file.close()
+            self._since_snapshot = 0
+        state = self.state_provider()
+        _write_atomically(self._snapshot_path(self.segment), json.dumps(state).encode("utf-8"))
+        for number in self._files("wal-", ".log"):
+            if number < self.segment:
+                os.remove(self._segment_path(number))
+        for number in self._files("snapshot-", ".json"):
+            if number < self.segment:
+                os.remove(self._snapshot_path(number))
+
+    def close(self):
+        self._closed = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+        if self._file is not None:
+            self._file.close()